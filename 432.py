@@ -1,10 +1,59 @@
+import time
+STARTED_AT = time.perf_counter()  # Startup is timed from here, before Qt is imported
+import json
+import os
 import sys
+import tracemalloc
+from collections import deque, namedtuple
+from datetime import date as Date, datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton,
-    QLabel, QLineEdit, QComboBox, QListWidget, QListWidgetItem, QMessageBox, QDialog, QGraphicsDropShadowEffect
+    QLabel, QLineEdit, QComboBox, QListView, QAbstractItemView, QMessageBox, QDialog, QGraphicsDropShadowEffect,
+    QAction, QMenu, QSystemTrayIcon, QStyle
 )
-from PyQt5.QtGui import QFont, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QColor, QPalette, QCursor
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from task_store import (
+    DATE_FILTERS, DEFAULT_TASK_FILE, PRIORITY_FILTERS, SORT_ORDERS, STATUS_FILTERS, TASK_LABELS,
+    Autosaver, ColumnarTaskList, QueryTerm, SQLiteTaskList, TaskList, TaskQuery,
+    compile_query, date_to_ordinal, parse_query, sort_key, task_matches
+)
+IMPORTED_AT = time.perf_counter()
+
+# Delay between the last keystroke in the search box and the search itself
+SEARCH_DEBOUNCE_MS = 150
+# Answer searches from a trigram index instead of scanning every task
+# (faster on large lists at the cost of extra memory)
+USE_TRIGRAM_INDEX = False
+# Score ~fuzzy searches with a NumPy index over every description instead of
+# one task at a time (much faster searches on large lists, but every task
+# added pays to index it, including when the saved tasks load; ignored when
+# NumPy is not installed)
+USE_FUZZY_INDEX = False
+# Keep tasks in ColumnarTaskList (compact arrays) instead of linked TaskNodes
+USE_COLUMNAR_STORE = False
+# File the in-memory task list is saved to when no SQLite file is given
+# (None turns saving off), the longest a change waits before it is written,
+# and how often a failed save is retried
+AUTOSAVE_FILE = DEFAULT_TASK_FILE
+AUTOSAVE_INTERVAL_MS = 1000
+AUTOSAVE_RETRY_MS = 10000
+# From this many tasks on, the window drops the list's drop shadow and themes
+# itself with a palette instead of a stylesheet (see set_performance_mode)
+PERFORMANCE_RENDER_MIN_TASKS = 50000
+# Time each display refresh phase by phase (see Profiler). TODO_PROFILE=1
+# turns it on; any other value is also the JSON trace file written on exit.
+# Ctrl+Shift+F12 opens the profiling menu either way.
+PROFILE_SETTING = os.environ.get("TODO_PROFILE", "")
+PROFILE_TRACE_FILE = os.path.join(os.path.expanduser("~"), ".todo_trace.json")
+SLOW_REFRESH_MS = 100  # Refreshes slower than this are logged to stderr
+# Print how long startup took, phase by phase, once the saved tasks are shown
+REPORT_STARTUP = bool(os.environ.get("TODO_STARTUP_REPORT"))
+# Tasks only have a date, so their reminder is raised at this hour of it;
+# the notification names at most REMINDER_LISTED of the tasks due
+REMINDER_HOUR = 9
+REMINDER_LISTED = 3
+REMINDER_MESSAGE_MS = 10000
 
 # -------------------------------
 # Language Dictionary
@@ -18,15 +67,19 @@ LANGUAGES = {
         "mark_as_complete": "Mark as Complete",
         "light_mode": "Light Mode",
         "dark_mode": "Dark Mode",
-        "search_placeholder": "Search Task...",
+        "search_placeholder": "Search Task... (~word for fuzzy search)",
         "filter_priority": "Filter by Priority:",
         "filter_status": "Filter by Status:",
+        "filter_date": "Filter by Date:",
         "sort_tasks": "Sort Tasks:",
-        "priority_filter_options": ["All", "High", "Medium", "Low"],
-        "status_filter_options": ["All", "Completed", "Incomplete"],
-        "sort_options": ["None", "Priority"],
+        "priority_filter_options": ["All"] + [TASK_LABELS["English"][name] for name in PRIORITY_FILTERS[1:]],
+        "status_filter_options": ["All"] + [TASK_LABELS["English"][status] for status in STATUS_FILTERS[1:]],
+        "date_filter_options": ["All", "Overdue", "This Week"],
+        "sort_options": ["None", "Priority", "Date", "Priority, then Date", "Completed Last"],
         "error": "Error",
         "please_provide_task": "Please provide both a task description and a date.",
+        "invalid_date": "Please enter a valid date in the format YYYY-MM-DD.",
+        "query_error": "Query not understood, searching for the plain text:",
         "edit_info": "Please select exactly one task to edit.",
         "task_not_found": "Task not found.",
         "delete_info": "Please select at least one task to delete.",
@@ -38,11 +91,18 @@ LANGUAGES = {
         "date": "Date (YYYY-MM-DD):",
         "save_changes": "Save Changes",
         "add": "Add Task",
-        "completed": "Completed",
-        "incomplete": "Incomplete",
-        "high_priority": "High",
-        "medium_priority": "Medium",
-        "low_priority": "Low"
+        "completed": TASK_LABELS["English"][True],
+        "incomplete": TASK_LABELS["English"][False],
+        "tasks_count": "Tasks",
+        "autosaved": "Saved {records} tasks ({bytes:,} bytes) in {ms:.1f} ms",
+        "autosave_failed": "Could not save tasks to {path}: {error}",
+        "autosave_unreadable": "Could not read tasks from {path}, changes will not be saved: {error}",
+        "autosave_damaged": "Skipped {count} damaged lines in {path}; the old file was kept as {backup}",
+        "reminder": "Due: {tasks}",
+        "reminder_more": " and {count:,} more",
+        "high_priority": TASK_LABELS["English"]["High"],
+        "medium_priority": TASK_LABELS["English"]["Medium"],
+        "low_priority": TASK_LABELS["English"]["Low"]
     },
     "Arabic": {
         "window_title": "مدير قائمة المهام",
@@ -52,15 +112,19 @@ LANGUAGES = {
         "mark_as_complete": "تمييز كمكتملة",
         "light_mode": "الوضع الفاتح",
         "dark_mode": "الوضع الداكن",
-        "search_placeholder": "ابحث عن مهمة...",
+        "search_placeholder": "ابحث عن مهمة... (~كلمة للبحث التقريبي)",
         "filter_priority": "تصفية حسب الأولوية:",
         "filter_status": "تصفية حسب الحالة:",
+        "filter_date": "تصفية حسب التاريخ:",
         "sort_tasks": "ترتيب المهام:",
-        "priority_filter_options": ["الكل", "عالي", "متوسط", "منخفض"],
-        "status_filter_options": ["الكل", "مكتملة", "غير مكتملة"],
-        "sort_options": ["لا شيء", "الأولوية"],
+        "priority_filter_options": ["الكل"] + [TASK_LABELS["Arabic"][name] for name in PRIORITY_FILTERS[1:]],
+        "status_filter_options": ["الكل"] + [TASK_LABELS["Arabic"][status] for status in STATUS_FILTERS[1:]],
+        "date_filter_options": ["الكل", "متأخرة", "هذا الأسبوع"],
+        "sort_options": ["لا شيء", "الأولوية", "التاريخ", "الأولوية ثم التاريخ", "المكتملة أخيرًا"],
         "error": "خطأ",
         "please_provide_task": "يرجى تقديم وصف المهمة والتاريخ.",
+        "invalid_date": "يرجى إدخال تاريخ صالح بالتنسيق YYYY-MM-DD.",
+        "query_error": "تعذر فهم الاستعلام، يتم البحث عن النص كما هو:",
         "edit_info": "يرجى اختيار مهمة واحدة للتعديل.",
         "task_not_found": "المهمة غير موجودة.",
         "delete_info": "يرجى اختيار مهمة واحدة على الأقل للحذف.",
@@ -72,268 +136,779 @@ LANGUAGES = {
         "date": "التاريخ (YYYY-MM-DD):",
         "save_changes": "حفظ التغييرات",
         "add": "إضافة المهمة",
-        "completed": "مكتملة",
-        "incomplete": "غير مكتملة",
-        "high_priority": "عالي",
-        "medium_priority": "متوسط",
-        "low_priority": "منخفض"
+        "completed": TASK_LABELS["Arabic"][True],
+        "incomplete": TASK_LABELS["Arabic"][False],
+        "tasks_count": "المهام",
+        "autosaved": "تم حفظ {records} مهمة ({bytes:,} بايت) في {ms:.1f} مللي ثانية",
+        "autosave_failed": "تعذر حفظ المهام في {path}: {error}",
+        "autosave_unreadable": "تعذرت قراءة المهام من {path}، ولن تُحفظ التغييرات: {error}",
+        "autosave_damaged": "تم تخطي {count} سطر تالف في {path}؛ حُفظ الملف القديم باسم {backup}",
+        "reminder": "مستحقة: {tasks}",
+        "reminder_more": " و{count:,} أخرى",
+        "high_priority": TASK_LABELS["Arabic"]["High"],
+        "medium_priority": TASK_LABELS["Arabic"]["Medium"],
+        "low_priority": TASK_LABELS["Arabic"]["Low"]
     }
 }
 
 # -------------------------------
-# Data Structures for Task Management
+# Dialogs for Adding and Editing Tasks
 # -------------------------------
-class TaskNode:
-    def __init__(self, description, priority, date):
-        self.description = description   # Task description
-        self.priority = priority         # Priority: High, Medium, Low
-        self.date = date                 # Date as a string (e.g., "2025-02-18")
-        self.completed = False           # Completion status
-        self.next = None                 # Pointer to the next task
-
-class TaskList:
-    def __init__(self):
-        self.head = None  # Start of the linked list
-
-    def add_task(self, description, priority, date):
-        new_task = TaskNode(description, priority, date)
-        if not self.head:
-            self.head = new_task
-        else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_task
+DIALOG_STYLE = """
+    QDialog { background-color: #34495e; color: #ecf0f1; }
+    QLabel { font-size: 14px; }
+    QLineEdit, QComboBox { border: 2px solid #3498db; border-radius: 8px; padding: 5px; }
+    QLineEdit { background-color: #ecf0f1; color: #2c3e50; }
+    QComboBox { background-color: #ecf0f1; color: #2c3e50; }
+    QPushButton { background-color: #2980b9; border: none; border-radius: 8px; color: white; padding: 10px; }
+    QPushButton:hover { background-color: #3498db; }
+"""
 
-    def delete_task(self, description):
-        if not self.head:
-            return
-        if self.head.description == description:
-            self.head = self.head.next
-            return
-        prev = self.head
-        current = self.head.next
-        while current:
-            if current.description == description:
-                prev.next = current.next
-                return
-            prev = current
-            current = current.next
-
-    def toggle_task_status(self, description):
-        current = self.head
-        while current:
-            if current.description == description:
-                current.completed = not current.completed
-                break
-            current = current.next
-
-    def edit_task(self, old_description, new_description, new_priority, new_date):
-        current = self.head
-        while current:
-            if current.description == old_description:
-                current.description = new_description
-                current.priority = new_priority
-                current.date = new_date
-                break
-            current = current.next
+class TaskDialog(QDialog):
+    """Description, priority and date fields shared by the add and edit dialogs.
 
-    def get_all_tasks(self):
-        tasks = []
-        current = self.head
-        while current:
-            tasks.append((current.description, current.priority, current.date, current.completed))
-            current = current.next
-        return tasks
+    ToDoApp builds one of each on first use and calls prepare() before
+    every exec_(), so the widgets and stylesheet are set up only once.
+    """
+
+    title_key = button_key = None  # LANGUAGES keys set by each subclass
 
-# -------------------------------
-# Dialog for Adding a New Task
-# -------------------------------
-class AddTaskDialog(QDialog):
     def __init__(self, parent=None, language="English"):
         super().__init__(parent)
-        self.language = language
-        self.setWindowTitle(LANGUAGES[self.language]["add_task_dialog_title"])
+        self.language = None
         self.setFixedSize(350, 250)
-        self.setStyleSheet("""
-            QDialog { background-color: #34495e; color: #ecf0f1; }
-            QLabel { font-size: 14px; }
-            QLineEdit, QComboBox { border: 2px solid #3498db; border-radius: 8px; padding: 5px; }
-            QLineEdit { background-color: #ecf0f1; color: #2c3e50; }
-            QComboBox { background-color: #ecf0f1; color: #2c3e50; }
-            QPushButton { background-color: #2980b9; border: none; border-radius: 8px; color: white; padding: 10px; }
-            QPushButton:hover { background-color: #3498db; }
-        """)
+        self.setStyleSheet(DIALOG_STYLE)
         layout = QVBoxLayout()
 
-        self.desc_label = QLabel(LANGUAGES[self.language]["task_description"])
+        self.desc_label = QLabel()
         layout.addWidget(self.desc_label)
         self.desc_edit = QLineEdit()
         layout.addWidget(self.desc_edit)
 
-        self.priority_label = QLabel(LANGUAGES[self.language]["priority"])
+        self.priority_label = QLabel()
         layout.addWidget(self.priority_label)
         self.priority_combo = QComboBox()
         self.priority_combo.addItems(["High", "Medium", "Low"])
         layout.addWidget(self.priority_combo)
 
-        self.date_label = QLabel(LANGUAGES[self.language]["date"])
+        self.date_label = QLabel()
         layout.addWidget(self.date_label)
         self.date_edit = QLineEdit()
-        self.date_edit.setPlaceholderText("e.g., 2025-02-18")
         layout.addWidget(self.date_edit)
 
-        self.add_button = QPushButton(LANGUAGES[self.language]["add"])
-        self.add_button.clicked.connect(self.accept)
-        layout.addWidget(self.add_button)
+        self.button = QPushButton()
+        self.button.clicked.connect(self.accept)
+        layout.addWidget(self.button)
 
         self.setLayout(layout)
+        self.set_language(language)
+
+    def set_language(self, language):
+        if language == self.language:
+            return
+        self.language = language
+        texts = LANGUAGES[language]
+        self.setWindowTitle(texts[self.title_key])
+        self.desc_label.setText(texts["task_description"])
+        self.priority_label.setText(texts["priority"])
+        self.date_label.setText(texts["date"])
+        self.button.setText(texts[self.button_key])
+
+    def prepare(self, language, description="", priority="High", date=""):
+        # Clear whatever the last use left behind and fill in this task
+        self.set_language(language)
+        self.desc_edit.setText(description)
+        self.priority_combo.setCurrentText(priority)
+        self.date_edit.setText(date)
+        self.desc_edit.setFocus()
+
+    def accept(self):
+        date = self.date_edit.text().strip()
+        if date and date_to_ordinal(date) is None:
+            QMessageBox.warning(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["invalid_date"])
+            return
+        super().accept()
 
     def get_data(self):
-        return self.desc_edit.text(), self.priority_combo.currentText(), self.date_edit.text()
+        return self.desc_edit.text(), self.priority_combo.currentText(), self.date_edit.text().strip()
+
+class AddTaskDialog(TaskDialog):
+    title_key, button_key = "add_task_dialog_title", "add"
+
+    def __init__(self, parent=None, language="English"):
+        super().__init__(parent, language)
+        self.date_edit.setPlaceholderText("e.g., 2025-02-18")
+
+class EditTaskDialog(TaskDialog):
+    title_key, button_key = "edit_task_dialog_title", "save_changes"
+
+    def __init__(self, parent=None, description="", priority="High", date="", language="English"):
+        super().__init__(parent, language)
+        self.prepare(language, description, priority, date)
 
 # -------------------------------
-# Dialog for Editing a Task
+# Refresh Instrumentation
 # -------------------------------
-class EditTaskDialog(QDialog):
-    def __init__(self, parent=None, description="", priority="High", date="", language="English"):
+PROFILE_RECORDS = 1000  # Refresh records kept for the trace file
+PROFILE_ALLOC_EVERY = 10  # Trace allocations in every nth refresh (0: never)
+PROFILE_SETTLE_MS = 500  # A refresh with nothing to paint is closed after this
+
+class NullPhase:
+    """What Profiler.phase returns while nothing is being recorded."""
+
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_PHASE = NullPhase()
+
+class ProfilePhase:
+    __slots__ = ("profiler", "record", "name", "rows_in", "rows_out", "start", "memory")
+
+    def __init__(self, profiler, record, name, rows_in):
+        self.profiler = profiler
+        self.record = record
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if self.record["alloc_traced"] else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        phase = {"name": self.name, "ms": round((end - self.start) * 1000, 3),
+                 "rows_in": self.rows_in, "rows_out": self.rows_out}
+        self.record["end"] = end
+        if self.memory is not None:
+            phase["alloc_bytes"] = tracemalloc.get_traced_memory()[0] - self.memory
+        self.record["phases"].append(phase)
+        return False
+
+class Profiler:
+    """Per-phase timings of display refreshes.
+
+    update_task_display opens a record with begin(); the code it runs wraps
+    each stage in `with PROFILER.phase(name, rows_in) as phase:` and may set
+    phase.rows_out. The list view closes the record after it has painted the
+    new rows. Every PROFILE_ALLOC_EVERY-th refresh runs under tracemalloc,
+    adding allocated bytes per phase and the peak for the refresh. While off
+    (or between refreshes) phase() hands out NULL_PHASE, so the only cost is
+    that call.
+    """
+
+    def __init__(self, enabled=False, trace_path=None):
+        self.enabled = enabled
+        self.trace_path = trace_path          # Written by ToDoApp on close
+        self.alloc_every = PROFILE_ALLOC_EVERY
+        self.records = deque(maxlen=PROFILE_RECORDS)
+        self.current = None                   # The open record, if any
+        self.refreshes = 0
+        self.listeners = []                   # Called with each finished record
+
+    def begin(self, kind, **details):
+        if not self.enabled:
+            return
+        self.finish()
+        self.refreshes += 1
+        traced = bool(self.alloc_every) and (self.refreshes - 1) % self.alloc_every == 0
+        if traced:
+            if tracemalloc.is_tracing():
+                traced = False  # Someone else's tracing; leave it alone
+            else:
+                tracemalloc.start()
+        self.current = {"kind": kind, "time": time.time(), "start": time.perf_counter(),
+                        "alloc_traced": traced, "phases": [], **details}
+
+    def phase(self, name, rows_in=None):
+        if self.current is None:
+            return NULL_PHASE
+        return ProfilePhase(self, self.current, name, rows_in)
+
+    def note(self, **details):
+        if self.current is not None:
+            self.current.update(details)
+
+    def finish(self):
+        record = self.current
+        if record is None:
+            return
+        self.current = None
+        # Up to the end of the last phase, so time spent waiting for the
+        # settle timer is not counted
+        start = record.pop("start")
+        record["ms"] = round((record.pop("end", start) - start) * 1000, 3)
+        if record["alloc_traced"]:
+            record["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.records.append(record)
+        if record["ms"] >= SLOW_REFRESH_MS:
+            print(f"slow {describe_record(record)}", file=sys.stderr)
+        for listener in self.listeners:
+            listener(record)
+
+    def dump(self, path=None):
+        path = path or self.trace_path or PROFILE_TRACE_FILE
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"slow_refresh_ms": SLOW_REFRESH_MS, "records": list(self.records)}, file,
+                      ensure_ascii=False, indent=1)
+        return path
+
+def describe_record(record):
+    # One line for the status bar and the slow-refresh log
+    parts = [f"{record['kind']} {record['ms']:.1f} ms"]
+    for phase in record["phases"]:
+        text = f"{phase['name']} {phase['ms']:.1f}"
+        if phase["rows_in"] is not None or phase["rows_out"] is not None:
+            rows_in = "" if phase["rows_in"] is None else f"{phase['rows_in']:,}"
+            rows_out = "" if phase["rows_out"] is None else f"{phase['rows_out']:,}"
+            text += f" ({rows_in}→{rows_out})"
+        parts.append(text)
+    if "alloc_peak_bytes" in record:
+        parts.append(f"peak {record['alloc_peak_bytes'] / 1024:,.0f} KiB")
+    if record.get("coalesced"):
+        parts.append(f"coalesced {record['coalesced']:,}")
+    return " · ".join(parts)
+
+PROFILER = Profiler(enabled=bool(PROFILE_SETTING),
+                    trace_path=PROFILE_SETTING if PROFILE_SETTING not in ("", "1") else None)
+
+# -------------------------------
+# Model/View Adapters for the Task List
+# -------------------------------
+PRIORITY_EMOJIS = {"High": "🔥", "Medium": "⭐", "Low": "🟢"}
+STATUS_EMOJIS = {True: "✅", False: "❌"}
+OVERDUE_COLOR = QColor("#e74c3c")  # Text of incomplete tasks whose date has passed
+MAX_REMOVE_RUNS = 64  # Beyond this many separate row ranges a reset is cheaper
+ROW_CACHE_SIZE = 20000  # Formatted rows kept per model before the cache starts over
+BULK_ADD_ROWS = 1000  # More tasks than this added at once reload the query instead
+
+# Everything format_task needs for one language, looked up once per row
+RenderTable = namedtuple("RenderTable", "priority_parts status_parts template")
+
+def compile_render_table(texts):
+    priority_labels = {"High": texts["high_priority"], "Medium": texts["medium_priority"], "Low": texts["low_priority"]}
+    return RenderTable(
+        priority_parts={priority: f"{PRIORITY_EMOJIS[priority]} - {label}" for priority, label in priority_labels.items()},
+        status_parts={True: f"{texts['completed']} {STATUS_EMOJIS[True]}",
+                      False: f"{texts['incomplete']} {STATUS_EMOJIS[False]}"},
+        template="{} {} - {} - {}",  # description, priority part, date, status part
+    )
+
+RENDER_TABLES = {language: compile_render_table(texts) for language, texts in LANGUAGES.items()}
+
+# Stores with a snapshot() at least this large are queried on a worker thread
+BACKGROUND_QUERY_MIN_TASKS = 20000
+QUERY_FIRST_CHUNK = 200  # Rows in the first delivery from a worker, about a screenful
+QUERY_CHUNK = 20000      # Rows in each later delivery
+
+class QuerySignals(QObject):
+    chunk = pyqtSignal(int, list)     # Generation, task ids in display order
+    narrowed = pyqtSignal(int, list)  # Generation, ascending rows that no longer match
+    finished = pyqtSignal(int)        # Generation
+
+class QueryTask(QRunnable):
+    """Runs one TaskQuery against a store snapshot and sends the ids back in chunks.
+
+    The first chunk is sent as soon as its page is read, before the rest of
+    the result is computed. Given the ids shown for a broader query, it
+    only sends the rows of those that no longer match.
+    """
+
+    def __init__(self, snapshot, query, generation, signals, narrow_ids=None):
+        super().__init__()
+        self.snapshot = snapshot
+        self.query = query
+        self.generation = generation
+        self.signals = signals
+        self.narrow_ids = narrow_ids
+        self.cancelled = False  # Set from the GUI thread when a newer query starts
+
+    def run(self):
+        if self.cancelled:
+            return
+        snapshot, query = self.snapshot, self.query
+        if self.narrow_ids is not None:
+            get_node = snapshot.get_node
+            rows = [row for row, node in enumerate(map(get_node, self.narrow_ids))
+                    if node is None or not task_matches(query, node)]
+            if not self.cancelled:
+                self.signals.narrowed.emit(self.generation, rows)
+                self.signals.finished.emit(self.generation)
+            return
+        # A page read in order from an index costs only its rows; one that is
+        # sorted after filtering, or fuzzy ranked, costs as much as the whole
+        # rest, which is then read at once and sent in chunks
+        plan = snapshot.plan(query)
+        paged = plan.in_order and plan.access not in ("fuzzy", "fuzzy_scan")
+        after, size = None, QUERY_FIRST_CHUNK
+        while not self.cancelled:
+            task_ids = snapshot.query_page(query, after, size)
+            for start in range(0, len(task_ids), QUERY_CHUNK):
+                if self.cancelled:
+                    return
+                self.signals.chunk.emit(self.generation, task_ids[start:start + QUERY_CHUNK])
+            if size is None or len(task_ids) < size:
+                break
+            after = sort_key(query.sort, snapshot.get_node(task_ids[-1]))
+            size = QUERY_CHUNK if paged else None
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation)
+
+def row_runs(rows):
+    # Group sorted row numbers into contiguous (first, last) ranges
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+class TaskListModel(QAbstractListModel):
+    """Shows the tasks matching a TaskQuery in display order.
+
+    Filtering and sorting are pushed down to the task list; results are
+    loaded a page at a time through canFetchMore/fetchMore and rows are
+    formatted lazily in data(). Large in-memory lists are queried on a
+    worker thread against a snapshot and rows arrive in chunks instead.
+    """
+
+    def __init__(self, task_list, language="English", parent=None):
         super().__init__(parent)
+        self.task_list = task_list
         self.language = language
-        self.setWindowTitle(LANGUAGES[self.language]["edit_task_dialog_title"])
-        self.setFixedSize(350, 250)
-        self.setStyleSheet("""
-            QDialog { background-color: #34495e; color: #ecf0f1; }
-            QLabel { font-size: 14px; }
-            QLineEdit, QComboBox { border: 2px solid #3498db; border-radius: 8px; padding: 5px; }
-            QLineEdit { background-color: #ecf0f1; color: #2c3e50; }
-            QComboBox { background-color: #ecf0f1; color: #2c3e50; }
-            QPushButton { background-color: #2980b9; border: none; border-radius: 8px; color: white; padding: 10px; }
-            QPushButton:hover { background-color: #3498db; }
-        """)
-        layout = QVBoxLayout()
+        self.render_table = RENDER_TABLES[language]
+        self.row_cache = {}       # Task id -> formatted row in the current language
+        self.formatted_rows = 0   # Rows formatted so far (cache misses), for the profiler
+        self.query = TaskQuery("", None, None, None, None)
+        self.task_ids = []        # Loaded result ids in display order
+        self.rows = None          # Task id -> row, rebuilt lazily after removals
+        self.exhausted = False    # True once every result page has been loaded
+        self.loading = False      # True while a QueryTask is delivering rows
+        self.generation = 0       # Chunks from any other generation are stale
+        self.query_task = None
+        self.query_signals = QuerySignals(self)
+        self.query_signals.chunk.connect(self.on_query_chunk)
+        self.query_signals.narrowed.connect(self.on_query_narrowed)
+        self.query_signals.finished.connect(self.on_query_finished)
+        self.query_pool = QThreadPool(self)
+        self.query_pool.setMaxThreadCount(1)
+        self.today = Date.today().toordinal()  # Rows due before this are overdue
+        self.reload()
+        task_list.add_listener(self.on_tasks_changed)
 
-        self.desc_label = QLabel(LANGUAGES[self.language]["task_description"])
-        layout.addWidget(self.desc_label)
-        self.desc_edit = QLineEdit()
-        self.desc_edit.setText(description)
-        layout.addWidget(self.desc_edit)
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.task_ids)
 
-        self.priority_label = QLabel(LANGUAGES[self.language]["priority"])
-        layout.addWidget(self.priority_label)
-        self.priority_combo = QComboBox()
-        self.priority_combo.addItems(["High", "Medium", "Low"])
-        self.priority_combo.setCurrentText(priority)
-        layout.addWidget(self.priority_combo)
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.node_at(index.row())
+        if node is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.format_task(node)
+        if role == Qt.UserRole:
+            return node.id
+        if role == Qt.ForegroundRole and not node.completed and 0 < node.due < self.today:
+            return OVERDUE_COLOR
+        return None
 
-        self.date_label = QLabel(LANGUAGES[self.language]["date"])
-        layout.addWidget(self.date_label)
-        self.date_edit = QLineEdit()
-        self.date_edit.setText(date)
-        layout.addWidget(self.date_edit)
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.loading
 
-        self.save_button = QPushButton(LANGUAGES[self.language]["save_changes"])
-        self.save_button.clicked.connect(self.accept)
-        layout.addWidget(self.save_button)
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+        task_ids = self.next_page()
+        if task_ids:
+            self.append_ids(task_ids)
 
-        self.setLayout(layout)
+    def next_page(self):
+        after = self.key_of(self.task_ids[-1]) if self.task_ids else None
+        page_size = self.task_list.page_size
+        task_ids = self.task_list.query_page(self.query, after, page_size)
+        if page_size is None or len(task_ids) < page_size:
+            self.exhausted = True
+        return task_ids
 
-    def get_data(self):
-        return self.desc_edit.text(), self.priority_combo.currentText(), self.date_edit.text()
+    def node_at(self, row):
+        return self.task_list.get_node(self.task_ids[row])
+
+    def key_of(self, task_id):
+        return sort_key(self.query.sort, self.task_list.get_node(task_id))
+
+    def row_of(self, task_id):
+        if self.rows is None:
+            self.rows = {tid: row for row, tid in enumerate(self.task_ids)}
+        return self.rows.get(task_id)
+
+    def set_query(self, query):
+        if query == self.query:
+            return
+        old_query = self.query
+        self.query = query
+        if query[1:] != old_query[1:] or old_query.search not in query.search:
+            self.reload()
+        elif self.in_background():
+            if self.loading or not self.exhausted:
+                self.reload()  # The broader results are not all here to narrow
+            else:
+                self.start_query(list(self.task_ids))  # Filtered on the worker
+        else:
+            # The new search extends the old one, so only loaded matches can still
+            # match; pages not loaded yet will be fetched with the new query
+            get_node = self.task_list.get_node
+            with PROFILER.phase("narrow", len(self.task_ids)) as phase:
+                self.remove_rows([row for row, task_id in enumerate(self.task_ids)
+                                  if not task_matches(query, get_node(task_id))])
+                phase.rows_out = len(self.task_ids)
+            if not self.exhausted and len(self.task_ids) < self.task_list.page_size:
+                self.fetchMore()
+
+    def in_background(self):
+        return hasattr(self.task_list, "snapshot") and len(self.task_list) >= BACKGROUND_QUERY_MIN_TASKS
+
+    def reload(self):
+        # Drop every row and load the results of the current query again
+        self.cancel_query()
+        self.beginResetModel()
+        self.task_ids = []
+        self.rows = None
+        self.exhausted = False
+        if self.in_background():
+            self.start_query()
+        else:
+            with PROFILER.phase("query", len(self.task_list)) as phase:
+                self.task_ids = self.next_page()
+                phase.rows_out = len(self.task_ids)
+        with PROFILER.phase("populate", len(self.task_ids)):
+            self.endResetModel()
+
+    def start_query(self, narrow_ids=None):
+        # Runs the current query on the worker, or narrows narrow_ids there
+        self.generation += 1
+        self.loading = True
+        with PROFILER.phase("snapshot", len(self.task_list)):
+            snapshot = self.task_list.snapshot()
+        self.query_task = QueryTask(snapshot, self.query, self.generation, self.query_signals, narrow_ids)
+        self.query_pool.start(self.query_task)
+
+    def cancel_query(self):
+        if self.query_task is not None:
+            self.query_task.cancelled = True
+            self.query_pool.clear()  # Drops it if the worker has not picked it up yet
+            self.query_task = None
+            self.generation += 1
+        self.loading = False
+
+    def on_query_chunk(self, generation, task_ids):
+        if generation == self.generation and self.loading:
+            with PROFILER.phase("chunk", len(task_ids)):
+                self.append_ids(task_ids)
+
+    def on_query_narrowed(self, generation, rows):
+        if generation == self.generation and self.loading:
+            with PROFILER.phase("narrow", len(self.task_ids)) as phase:
+                self.remove_rows(rows)
+                phase.rows_out = len(self.task_ids)
+
+    def on_query_finished(self, generation):
+        if generation == self.generation and self.loading:
+            self.loading = False
+            self.exhausted = True
+            self.query_task = None
+            with PROFILER.phase("loaded") as phase:
+                phase.rows_out = len(self.task_ids)
+
+    def append_ids(self, task_ids):
+        first = len(self.task_ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(task_ids) - 1)
+        self.task_ids.extend(task_ids)
+        if self.rows is not None:
+            for row, task_id in enumerate(task_ids, first):
+                self.rows[task_id] = row
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        # rows must be sorted ascending
+        if not rows:
+            return
+        runs = row_runs(rows)
+        if len(runs) > MAX_REMOVE_RUNS:
+            removed = set(rows)
+            self.beginResetModel()
+            self.task_ids = [task_id for row, task_id in enumerate(self.task_ids) if row not in removed]
+            self.rows = None
+            self.endResetModel()
+            return
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.task_ids[first:last + 1]
+            self.endRemoveRows()
+        self.rows = None
+
+    def insert_position(self, key):
+        lo, hi = 0, len(self.task_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_of(self.task_ids[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def place_task(self, node):
+        key = sort_key(self.query.sort, node)
+        row = self.insert_position(key)
+        if row == len(self.task_ids) and not self.exhausted:
+            return  # Beyond the loaded pages; it will arrive with a later page
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.task_ids.insert(row, node.id)
+        self.rows = None
+        self.endInsertRows()
+
+    def in_place(self, row, node):
+        # True if node's sort key still fits between its neighbours
+        if row + 1 == len(self.task_ids) and not self.exhausted:
+            return False  # It may now belong among the pages not loaded yet
+        key = sort_key(self.query.sort, node)
+        if row > 0 and self.key_of(self.task_ids[row - 1]) > key:
+            return False
+        if row + 1 < len(self.task_ids) and self.key_of(self.task_ids[row + 1]) < key:
+            return False
+        return True
+
+    def format_task(self, node):
+        # Rows stay cached until the task changes or the language does
+        text = self.row_cache.get(node.id)
+        if text is None:
+            table = self.render_table
+            text = table.template.format(node.description, table.priority_parts.get(node.priority, f" - {node.priority}"),
+                                         node.date, table.status_parts[bool(node.completed)])
+            if len(self.row_cache) >= ROW_CACHE_SIZE:
+                self.row_cache.clear()
+            self.row_cache[node.id] = text
+            self.formatted_rows += 1
+        return text
+
+    def set_language(self, language):
+        self.language = language
+        self.render_table = RENDER_TABLES[language]
+        self.row_cache.clear()
+        if self.task_ids:
+            self.dataChanged.emit(self.index(0), self.index(len(self.task_ids) - 1), [Qt.DisplayRole])
+
+    def set_today(self, today):
+        # Called when the day changes, so yesterday's tasks show as overdue
+        if today != self.today:
+            self.today = today
+            if self.task_ids:
+                self.dataChanged.emit(self.index(0), self.index(len(self.task_ids) - 1), [Qt.ForegroundRole])
+
+    def on_tasks_changed(self, event, task_ids):
+        get_node = self.task_list.get_node
+        for task_id in task_ids:
+            self.row_cache.pop(task_id, None)
+        if self.loading or (event == "added" and len(task_ids) > BULK_ADD_ROWS):
+            # The running query saw the tasks before this change, or an import
+            # or load added more than is worth placing one by one; start over
+            self.reload()
+            return
+        if event == "added":
+            nodes = [node for node in map(get_node, task_ids) if node is not None and task_matches(self.query, node)]
+            last_key = self.key_of(self.task_ids[-1]) if self.task_ids else None
+            if self.exhausted and all(last_key is None or sort_key(self.query.sort, node) > last_key for node in nodes):
+                # Common case: new tasks sort after everything shown, append them in one go
+                nodes.sort(key=lambda node: sort_key(self.query.sort, node))
+                if nodes:
+                    self.append_ids([node.id for node in nodes])
+            else:
+                for node in nodes:
+                    self.place_task(node)
+        elif event == "removed":
+            self.remove_rows(sorted(row for row in map(self.row_of, task_ids) if row is not None))
+        elif event == "changed":
+            changed, removed_rows, moved_nodes = [], [], []
+            for task_id in task_ids:
+                row = self.row_of(task_id)
+                node = get_node(task_id)
+                if node is None or not task_matches(self.query, node):
+                    if row is not None:
+                        removed_rows.append(row)
+                elif row is None:
+                    moved_nodes.append(node)
+                else:
+                    changed.append((row, node))
+            if all(self.in_place(row, node) for row, node in changed):
+                changed_rows = [row for row, node in changed]
+            else:
+                # Several rows may have moved relative to each other: take them
+                # all out and insert each one at its sorted position again
+                changed_rows = []
+                removed_rows += [row for row, node in changed]
+                moved_nodes += [node for row, node in changed]
+            for first, last in row_runs(sorted(changed_rows)):
+                self.dataChanged.emit(self.index(first), self.index(last), [Qt.DisplayRole])
+            self.remove_rows(sorted(removed_rows))
+            for node in moved_nodes:
+                self.place_task(node)
+
+class TaskListView(QListView):
+    def paintEvent(self, event):
+        # Closes the profiler's refresh record once its rows are on screen
+        if PROFILER.current is None:
+            super().paintEvent(event)
+            return
+        model = self.model()
+        formatted = model.formatted_rows
+        with PROFILER.phase("paint") as phase:
+            super().paintEvent(event)
+            phase.rows_out = model.formatted_rows - formatted
+        if not model.loading:
+            PROFILER.finish()
 
 # -------------------------------
 # Main Application Window
 # -------------------------------
+# Window stylesheets, one per theme. Qt parses a stylesheet whenever it is
+# set, so apply_theme sets one only when the theme actually changes.
+# Dark Mode: Purple & Black
+DARK_STYLE = """
+    QMainWindow {
+        background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #000000, stop:1 #800080);
+    }
+    QLabel {
+        color: #ffffff;
+        font-size: 14px;
+    }
+    QPushButton {
+        background-color: #800080;
+        border: none;
+        border-radius: 8px;
+        color: white;
+        padding: 10px;
+    }
+    QPushButton:hover {
+        background-color: #9932CC;
+    }
+    QLineEdit, QComboBox {
+        border: 2px solid #800080;
+        border-radius: 8px;
+        padding: 5px;
+    }
+    QLineEdit {
+        background-color: #2c2c2c;
+        color: #ffffff;
+    }
+    QComboBox {
+        background-color: #2c2c2c;
+        color: #ffffff;
+    }
+    QListView {
+        background-color: #2c2c2c;
+        border: none;
+        padding: 5px;
+        border-radius: 8px;
+        color: #ffffff;
+    }
+"""
+# Light Mode: Blue & Grey
+LIGHT_STYLE = """
+    QMainWindow {
+        background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #3b5998, stop:1 #8b9dc3);
+    }
+    QLabel {
+        color: #2c3e50;
+        font-size: 14px;
+    }
+    QPushButton {
+        background-color: #3b5998;
+        border: none;
+        border-radius: 8px;
+        color: white;
+        padding: 10px;
+    }
+    QPushButton:hover {
+        background-color: #2c3e50;
+    }
+    QLineEdit, QComboBox {
+        border: 2px solid #3b5998;
+        border-radius: 8px;
+        padding: 5px;
+    }
+    QLineEdit {
+        background-color: white;
+        color: #2c3e50;
+    }
+    QComboBox {
+        background-color: white;
+        color: #2c3e50;
+    }
+    QListView {
+        background-color: white;
+        border: none;
+        padding: 5px;
+        border-radius: 8px;
+        color: #2c3e50;
+    }
+"""
+THEME_STYLES = {True: DARK_STYLE, False: LIGHT_STYLE}  # Keyed by dark_mode
+# The same themes as flat palettes for performance rendering: a palette change
+# repaints the widgets without re-polishing each one against a stylesheet
+THEME_COLORS = {
+    True: {"Window": "#2a0a2a", "WindowText": "#ffffff", "Base": "#2c2c2c", "Text": "#ffffff",
+           "Button": "#800080", "ButtonText": "#ffffff", "Highlight": "#9932CC", "HighlightedText": "#ffffff"},
+    False: {"Window": "#8b9dc3", "WindowText": "#2c3e50", "Base": "#ffffff", "Text": "#2c3e50",
+            "Button": "#3b5998", "ButtonText": "#ffffff", "Highlight": "#3b5998", "HighlightedText": "#ffffff"},
+}
+THEME_PALETTES = {}  # dark_mode -> QPalette, built on first use (needs a QApplication)
+
+def theme_palette(dark_mode):
+    palette = THEME_PALETTES.get(dark_mode)
+    if palette is None:
+        palette = QPalette()
+        for role, color in THEME_COLORS[dark_mode].items():
+            palette.setColor(getattr(QPalette, role), QColor(color))
+        THEME_PALETTES[dark_mode] = palette
+    return palette
+
 class ToDoApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, task_list=None, autosave_path=None):
         super().__init__()
+        # Startup phase -> perf_counter() when it ended; see startup_report()
+        self.startup_marks = {"imports": IMPORTED_AT, "init": time.perf_counter()}
         self.language = "English"  # Default language
         self.dark_mode = True      # Start in dark mode
-        self.task_list = TaskList()  # Linked list for tasks
-
-        # Define stylesheets:
-        # Dark Mode: Purple & Black
-        self.dark_style = """
-            QMainWindow {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #000000, stop:1 #800080);
-            }
-            QLabel {
-                color: #ffffff;
-                font-size: 14px;
-            }
-            QPushButton {
-                background-color: #800080;
-                border: none;
-                border-radius: 8px;
-                color: white;
-                padding: 10px;
-            }
-            QPushButton:hover {
-                background-color: #9932CC;
-            }
-            QLineEdit, QComboBox {
-                border: 2px solid #800080;
-                border-radius: 8px;
-                padding: 5px;
-            }
-            QLineEdit {
-                background-color: #2c2c2c;
-                color: #ffffff;
-            }
-            QComboBox {
-                background-color: #2c2c2c;
-                color: #ffffff;
-            }
-            QListWidget {
-                background-color: #2c2c2c;
-                border: none;
-                padding: 5px;
-                border-radius: 8px;
-                color: #ffffff;
-            }
-        """
-        # Light Mode: Blue & Grey
-        self.light_style = """
-            QMainWindow {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #3b5998, stop:1 #8b9dc3);
-            }
-            QLabel {
-                color: #2c3e50;
-                font-size: 14px;
-            }
-            QPushButton {
-                background-color: #3b5998;
-                border: none;
-                border-radius: 8px;
-                color: white;
-                padding: 10px;
-            }
-            QPushButton:hover {
-                background-color: #2c3e50;
-            }
-            QLineEdit, QComboBox {
-                border: 2px solid #3b5998;
-                border-radius: 8px;
-                padding: 5px;
-            }
-            QLineEdit {
-                background-color: white;
-                color: #2c3e50;
-            }
-            QComboBox {
-                background-color: white;
-                color: #2c3e50;
-            }
-            QListWidget {
-                background-color: white;
-                border: none;
-                padding: 5px;
-                border-radius: 8px;
-                color: #2c3e50;
-            }
-        """
+        if task_list is None:
+            store = ColumnarTaskList if USE_COLUMNAR_STORE else TaskList  # Linked list for tasks
+            task_list = store(use_trigram_index=USE_TRIGRAM_INDEX, use_fuzzy_index=USE_FUZZY_INDEX)
+        self.task_list = task_list
+        # The saved tasks are read after the first paint (see load_saved_tasks),
+        # so the window appears before a large file has been parsed
+        self.autosave_path = autosave_path
+        self.autosave = None
+        self.coalesced_refreshes = 0  # Refresh requests absorbed by an already pending refresh
+        self.dialogs = {}  # Dialog class -> the instance reused by task_dialog()
+        self.reminder_wake = None  # When reminder_timer fires next
+        self.query_error = None    # Status bar message about the search box text
+        self.tray_icon = None      # Created for the first reminder, if there is a tray
+        self.theme_applied = None  # (dark_mode, performance_mode) last applied
+        self.performance_mode = False
+
         self.initUI()
         self.apply_theme()
         self.update_language()
+        self.startup_marks["window"] = time.perf_counter()
 
     def initUI(self):
         self.setFont(QFont("Segoe UI", 10))
@@ -379,46 +954,141 @@ class ToDoApp(QMainWindow):
         self.main_layout.addLayout(self.button_layout)
 
         # --- Search and Filter Layout ---
+        # Filter changes mark the display dirty and a zero-interval timer runs
+        # one rebuild when control returns to the event loop
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(0)
+        self.refresh_timer.timeout.connect(self.update_task_display)
+        # Keystrokes restart a single-shot timer, so a burst of typing runs one search
         self.search_box = QLineEdit()
-        self.search_box.textChanged.connect(self.update_task_display)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.schedule_refresh)
+        self.search_box.textChanged.connect(self.search_timer.start)
         self.main_layout.addWidget(self.search_box)
 
         self.filter_priority_label = QLabel()
         self.main_layout.addWidget(self.filter_priority_label)
         self.filter_priority_combo = QComboBox()
         self.main_layout.addWidget(self.filter_priority_combo)
-        self.filter_priority_combo.currentIndexChanged.connect(self.update_task_display)
+        self.filter_priority_combo.currentIndexChanged.connect(self.schedule_refresh)
 
         self.filter_status_label = QLabel()
         self.main_layout.addWidget(self.filter_status_label)
         self.filter_status_combo = QComboBox()
         self.main_layout.addWidget(self.filter_status_combo)
-        self.filter_status_combo.currentIndexChanged.connect(self.update_task_display)
+        self.filter_status_combo.currentIndexChanged.connect(self.schedule_refresh)
+
+        self.filter_date_label = QLabel()
+        self.main_layout.addWidget(self.filter_date_label)
+        self.filter_date_combo = QComboBox()
+        self.main_layout.addWidget(self.filter_date_combo)
+        self.filter_date_combo.currentIndexChanged.connect(self.schedule_refresh)
 
         self.sort_tasks_label = QLabel()
         self.main_layout.addWidget(self.sort_tasks_label)
         self.sort_combo = QComboBox()
         self.main_layout.addWidget(self.sort_combo)
-        self.sort_combo.currentIndexChanged.connect(self.update_task_display)
+        self.sort_combo.currentIndexChanged.connect(self.schedule_refresh)
+
+        # --- Task List View ---
+        self.task_model = TaskListModel(self.task_list, language=self.language)
+        self.tasks_view = TaskListView()
+        self.tasks_view.setModel(self.task_model)
+        self.tasks_view.setUniformItemSizes(True)
+        self.tasks_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.add_shadow()
+        self.main_layout.addWidget(self.tasks_view)
+
+        # The counts on the combos and in the title follow every change, at
+        # most once per event-loop turn
+        self.counts_timer = QTimer(self)
+        self.counts_timer.setSingleShot(True)
+        self.counts_timer.setInterval(0)
+        self.counts_timer.timeout.connect(self.update_counts)
+        # Changes are saved together once the first of them is this old
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(self.autosave_changes)
+        # The one timer behind all reminders, armed by schedule_reminder()
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.setTimerType(Qt.PreciseTimer)
+        self.reminder_timer.timeout.connect(self.check_reminders)
+        self.task_list.add_listener(self.on_tasks_changed)
+        # The first display comes from update_language's scheduled refresh
 
-        # --- Task List Widget ---
-        self.tasks_list_widget = QListWidget()
-        self.tasks_list_widget.setSelectionMode(QListWidget.ExtendedSelection)
+        # Profiling: a status-bar overlay, a timer closing refreshes that
+        # paint nothing, and a menu kept off the UI (Ctrl+Shift+F12)
+        self.profile_label = QLabel()
+        self.statusBar().addPermanentWidget(self.profile_label)
+        self.profile_label.setVisible(PROFILER.enabled)
+        PROFILER.listeners.append(self.show_profile)
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setSingleShot(True)
+        self.profile_timer.setInterval(PROFILE_SETTLE_MS)
+        self.profile_timer.timeout.connect(self.settle_profile)
+        self.profile_menu = QMenu(self)
+        self.profile_action = self.profile_menu.addAction("Profile refreshes")
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(PROFILER.enabled)
+        self.profile_action.toggled.connect(self.set_profiling)
+        self.alloc_action = self.profile_menu.addAction("Sample allocations")
+        self.alloc_action.setCheckable(True)
+        self.alloc_action.setChecked(bool(PROFILER.alloc_every))
+        self.alloc_action.toggled.connect(
+            lambda checked: setattr(PROFILER, "alloc_every", PROFILE_ALLOC_EVERY if checked else 0))
+        self.profile_menu.addAction("Save trace").triggered.connect(self.save_trace)
+        menu_action = QAction(self)
+        menu_action.setShortcut("Ctrl+Shift+F12")
+        menu_action.triggered.connect(lambda: self.profile_menu.exec_(QCursor.pos()))
+        self.addAction(menu_action)
+
+    def add_shadow(self):
         shadow = QGraphicsDropShadowEffect()
         shadow.setBlurRadius(15)
         shadow.setXOffset(3)
         shadow.setYOffset(3)
         shadow.setColor(QColor(0, 0, 0, 160))
-        self.tasks_list_widget.setGraphicsEffect(shadow)
-        self.main_layout.addWidget(self.tasks_list_widget)
-
-        self.update_task_display()
+        self.tasks_view.setGraphicsEffect(shadow)
 
     def apply_theme(self):
-        if self.dark_mode:
-            self.setStyleSheet(self.dark_style)
+        theme = (self.dark_mode, self.performance_mode)
+        if self.theme_applied == theme:
+            return
+        if self.performance_mode:
+            if self.theme_applied is None or not self.theme_applied[1]:
+                self.setStyleSheet("")
+            self.setPalette(theme_palette(self.dark_mode))
+        else:
+            if self.theme_applied is not None and self.theme_applied[1]:
+                self.setPalette(QApplication.palette())
+            self.setStyleSheet(THEME_STYLES[self.dark_mode])
+        self.theme_applied = theme
+
+    def set_performance_mode(self, enabled):
+        # The shadow makes every scroll and repaint of the list render it
+        # offscreen first, which is what costs most on long lists
+        if enabled == self.performance_mode:
+            return
+        self.performance_mode = enabled
+        if enabled:
+            self.tasks_view.setGraphicsEffect(None)  # Deletes the effect
         else:
-            self.setStyleSheet(self.light_style)
+            self.add_shadow()
+        self.apply_theme()
+
+    def update_render_mode(self):
+        # Switches off again only well below the threshold, so a list hovering
+        # around it does not flip back and forth
+        total = self.task_list.counts.total
+        if self.performance_mode:
+            self.set_performance_mode(total >= PERFORMANCE_RENDER_MIN_TASKS * 0.9)
+        else:
+            self.set_performance_mode(total >= PERFORMANCE_RENDER_MIN_TASKS)
 
     def set_dark_mode(self):
         self.dark_mode = True
@@ -430,11 +1100,167 @@ class ToDoApp(QMainWindow):
 
     def set_language(self, lang):
         self.language = lang
+        self.task_model.set_language(lang)
         self.update_language()
-        self.update_task_display()
+        self.schedule_refresh()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if "first_paint" not in self.startup_marks:
+            self.startup_marks["first_paint"] = time.perf_counter()
+            # Runs once this paint has reached the screen
+            QTimer.singleShot(0, self.load_saved_tasks)
+
+    def load_saved_tasks(self):
+        if self.autosave_path and self.autosave is None:
+            self.autosave = Autosaver(self.task_list, self.autosave_path)
+            texts = LANGUAGES[self.language]
+            if self.autosave.read_error is not None:
+                self.statusBar().showMessage(texts["autosave_unreadable"].format(
+                    path=self.autosave.path, error=self.autosave.read_error))
+            elif self.autosave.damaged:
+                self.statusBar().showMessage(texts["autosave_damaged"].format(
+                    count=self.autosave.damaged, path=self.autosave.path, backup=self.autosave.backup))
+        self.startup_marks["tasks_loaded"] = time.perf_counter()
+        self.schedule_reminder()
+        if REPORT_STARTUP:
+            print(self.startup_report(), file=sys.stderr)
+
+    def startup_report(self):
+        # Milliseconds from STARTED_AT to the end of each phase reached so far
+        lines, previous = [], STARTED_AT
+        for phase, moment in self.startup_marks.items():
+            lines.append(f"{phase:12} {(moment - STARTED_AT) * 1000:9.1f} ms  (+{(moment - previous) * 1000:.1f})")
+            previous = moment
+        lines.append(f"{len(self.task_list):,} tasks")
+        return "startup:\n  " + "\n  ".join(lines)
+
+    def schedule_refresh(self):
+        # Ask for one update_task_display on the next event-loop turn
+        if self.refresh_timer.isActive():
+            self.coalesced_refreshes += 1
+        else:
+            self.refresh_timer.start()
+
+    def on_tasks_changed(self, event, task_ids):
+        self.counts_timer.start()
+        if self.autosave is not None and not self.autosave_timer.isActive():
+            self.autosave_timer.start()
+        if self.reminder_wake is not None:
+            self.schedule_reminder()
+
+    def schedule_reminder(self):
+        # Wakes for the earliest reminder the task list has queued, or at
+        # midnight, when more rows turn overdue; next_due() is read from a
+        # heap, so no task is visited
+        now = datetime.now()
+        wake = datetime.fromordinal(now.toordinal() + 1)
+        due = self.task_list.next_due()
+        if due is not None:
+            wake = min(wake, datetime.fromordinal(due).replace(hour=REMINDER_HOUR))
+        if wake != self.reminder_wake or not self.reminder_timer.isActive():
+            self.reminder_wake = wake
+            self.reminder_timer.start(max(int((wake - now).total_seconds() * 1000), 0))
+
+    def check_reminders(self):
+        now = datetime.now()
+        today = now.toordinal()
+        self.task_model.set_today(today)
+        # Before REMINDER_HOUR only the tasks due up to yesterday are due
+        task_ids = self.task_list.pop_due(today if now.hour >= REMINDER_HOUR else today - 1)
+        if task_ids:
+            self.show_reminder(task_ids)
+        self.schedule_reminder()
+
+    def show_reminder(self, task_ids):
+        texts = LANGUAGES[self.language]
+        nodes = [node for node in map(self.task_list.get_node, task_ids[:REMINDER_LISTED]) if node is not None]
+        message = texts["reminder"].format(tasks=", ".join(node.description for node in nodes))
+        if len(task_ids) > len(nodes):
+            message += texts["reminder_more"].format(count=len(task_ids) - len(nodes))
+        self.statusBar().showMessage(message, REMINDER_MESSAGE_MS)
+        QApplication.alert(self)
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            if self.tray_icon is None:
+                self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.SP_MessageBoxInformation), self)
+                self.tray_icon.show()
+            self.tray_icon.showMessage(texts["window_title"], message)
+
+    def autosave_changes(self):
+        queued = self.autosave.flush()
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)  # Back from a retry
+        if self.autosave.error is not None:
+            # Stays up until a save succeeds; each retry rewrites the whole file
+            self.statusBar().showMessage(self.autosave_error_message())
+            self.autosave_timer.start(AUTOSAVE_RETRY_MS)
+            return
+        if self.autosave.history:
+            # The write just queued may still be running; report the latest finished one
+            last = self.autosave.history[-1]
+            self.statusBar().showMessage(LANGUAGES[self.language]["autosaved"].format(
+                records=last.records, bytes=last.bytes, ms=last.seconds * 1000), 3000)
+        if queued:
+            self.autosave_timer.start()  # Look again once that write is done
+
+    def autosave_error_message(self):
+        return LANGUAGES[self.language]["autosave_failed"].format(path=self.autosave.path, error=self.autosave.error)
+
+    def set_profiling(self, enabled):
+        PROFILER.enabled = enabled
+        if not enabled:
+            PROFILER.finish()
+        self.profile_label.setVisible(enabled)
+
+    def show_profile(self, record):
+        self.profile_label.setText(describe_record(record))
+
+    def settle_profile(self):
+        # Background loads keep the record open until their last chunk
+        if self.task_model.loading:
+            self.profile_timer.start()
+        else:
+            PROFILER.finish()
+
+    def save_trace(self):
+        try:
+            path = PROFILER.dump()
+        except OSError as error:
+            self.statusBar().showMessage(str(error), 5000)
+        else:
+            self.statusBar().showMessage(path, 5000)
+
+    def closeEvent(self, event):
+        # Last changes are written before the window goes away
+        if self.autosave is not None:
+            self.autosave_timer.stop()
+            self.autosave.close()
+            if self.autosave.error is not None:
+                QMessageBox.warning(self, LANGUAGES[self.language]["error"], self.autosave_error_message())
+            elif self.autosave.read_error is not None and self.autosave.dirty:
+                QMessageBox.warning(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language][
+                    "autosave_unreadable"].format(path=self.autosave.path, error=self.autosave.read_error))
+        PROFILER.finish()
+        if self.show_profile in PROFILER.listeners:
+            PROFILER.listeners.remove(self.show_profile)
+        if PROFILER.trace_path:
+            PROFILER.dump()
+        super().closeEvent(event)
+
+    def update_counts(self):
+        # Read from the store's TaskCounts, so no task is visited
+        texts = LANGUAGES[self.language]
+        counts = self.task_list.counts
+        for combo, options, values, count in (
+                (self.filter_priority_combo, "priority_filter_options", PRIORITY_FILTERS, counts.priority),
+                (self.filter_status_combo, "status_filter_options", STATUS_FILTERS, counts.status)):
+            for index, (label, value) in enumerate(zip(texts[options], values)):
+                combo.setItemText(index, f"{label} ({count(value):,})")
+        self.setWindowTitle(f"{texts['window_title']} — {texts['tasks_count']}: {counts.total:,}"
+                            f" · {texts['high_priority']}: {counts.priority('High'):,}"
+                            f" · {texts['completed']}: {counts.status(True):,}")
+        self.update_render_mode()
 
     def update_language(self):
-        self.setWindowTitle(LANGUAGES[self.language]["window_title"])
         self.add_button.setText(LANGUAGES[self.language]["add_task"])
         self.edit_button.setText(LANGUAGES[self.language]["edit_task"])
         self.delete_button.setText(LANGUAGES[self.language]["delete_task"])
@@ -444,109 +1270,132 @@ class ToDoApp(QMainWindow):
         self.search_box.setPlaceholderText(LANGUAGES[self.language]["search_placeholder"])
         self.filter_priority_label.setText(LANGUAGES[self.language]["filter_priority"])
         self.filter_status_label.setText(LANGUAGES[self.language]["filter_status"])
+        self.filter_date_label.setText(LANGUAGES[self.language]["filter_date"])
         self.sort_tasks_label.setText(LANGUAGES[self.language]["sort_tasks"])
-        self.filter_priority_combo.clear()
-        self.filter_priority_combo.addItems(LANGUAGES[self.language]["priority_filter_options"])
-        self.filter_status_combo.clear()
-        self.filter_status_combo.addItems(LANGUAGES[self.language]["status_filter_options"])
-        self.sort_combo.clear()
-        self.sort_combo.addItems(LANGUAGES[self.language]["sort_options"])
+        # Refill the combos with signals blocked so clear()/addItems() do not
+        # each request a refresh, and keep the chosen option across languages
+        for combo, options in ((self.filter_priority_combo, "priority_filter_options"),
+                               (self.filter_status_combo, "status_filter_options"),
+                               (self.filter_date_combo, "date_filter_options"),
+                               (self.sort_combo, "sort_options")):
+            index = max(combo.currentIndex(), 0)
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems(LANGUAGES[self.language][options])
+            combo.setCurrentIndex(index)
+            combo.blockSignals(False)
+        self.update_counts()
+        self.schedule_refresh()
+
+    def task_dialog(self, dialog_class):
+        # Each dialog is built on first use and kept for the next one
+        dialog = self.dialogs.get(dialog_class)
+        if dialog is None:
+            dialog = self.dialogs[dialog_class] = dialog_class(self, language=self.language)
+        return dialog
 
     def open_add_task_dialog(self):
-        dialog = AddTaskDialog(self, language=self.language)
+        dialog = self.task_dialog(AddTaskDialog)
+        dialog.prepare(self.language)
         if dialog.exec_():
             description, priority, date = dialog.get_data()
             if description.strip() == "" or date.strip() == "":
                 QMessageBox.warning(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["please_provide_task"])
                 return
             self.task_list.add_task(description, priority, date)
-            self.update_task_display()
+
+    def selected_task_ids(self):
+        return [index.data(Qt.UserRole) for index in self.tasks_view.selectionModel().selectedIndexes()]
 
     def edit_task(self):
-        selected_items = self.tasks_list_widget.selectedItems()
-        if len(selected_items) != 1:
+        selected_ids = self.selected_task_ids()
+        if len(selected_ids) != 1:
             QMessageBox.information(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["edit_info"])
             return
-        # Retrieve the full description stored in the item data
-        item = selected_items[0]
-        old_description = item.data(Qt.UserRole)
-        task_to_edit = None
-        for task in self.task_list.get_all_tasks():
-            if task[0] == old_description:
-                task_to_edit = task
-                break
+        task_id = selected_ids[0]
+        task_to_edit = self.task_list.get_task(task_id)
         if task_to_edit is None:
             QMessageBox.information(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["task_not_found"])
             return
-        dialog = EditTaskDialog(self, description=task_to_edit[0], priority=task_to_edit[1], date=task_to_edit[2], language=self.language)
+        dialog = self.task_dialog(EditTaskDialog)
+        dialog.prepare(self.language, task_to_edit[0], task_to_edit[1], task_to_edit[2])
         if dialog.exec_():
             new_description, new_priority, new_date = dialog.get_data()
             if new_description.strip() == "" or new_date.strip() == "":
                 QMessageBox.warning(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["please_provide_task"])
                 return
-            self.task_list.edit_task(old_description, new_description, new_priority, new_date)
-            self.update_task_display()
+            self.task_list.edit_task(task_id, new_description, new_priority, new_date)
 
     def delete_tasks(self):
-        selected_items = self.tasks_list_widget.selectedItems()
-        if not selected_items:
+        selected_ids = self.selected_task_ids()
+        if not selected_ids:
             QMessageBox.information(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["delete_info"])
             return
-        for item in selected_items:
-            description = item.data(Qt.UserRole)
-            self.task_list.delete_task(description)
-        self.update_task_display()
+        self.task_list.delete_many(selected_ids)
 
     def toggle_tasks_status(self):
-        selected_items = self.tasks_list_widget.selectedItems()
-        if not selected_items:
+        selected_ids = self.selected_task_ids()
+        if not selected_ids:
             QMessageBox.information(self, LANGUAGES[self.language]["error"], LANGUAGES[self.language]["mark_done_info"])
             return
-        for item in selected_items:
-            description = item.data(Qt.UserRole)
-            self.task_list.toggle_task_status(description)
-        self.update_task_display()
+        self.task_list.toggle_many(selected_ids)
 
     def update_task_display(self):
-        tasks = self.task_list.get_all_tasks()
-        priority_emojis = {"High": "🔥", "Medium": "⭐", "Low": "🟢"}
-        status_emojis = {True: "✅", False: "❌"}
-        search_text = self.search_box.text().strip().lower()
-        if search_text:
-            tasks = [task for task in tasks if search_text in task[0].lower()]
-        priority_filter = self.filter_priority_combo.currentText()
-        if priority_filter != LANGUAGES[self.language]["priority_filter_options"][0]:
-            tasks = [task for task in tasks if task[1] == priority_filter or
-                     (priority_filter == LANGUAGES[self.language]["high_priority"] and task[1] == "High") or
-                     (priority_filter == LANGUAGES[self.language]["medium_priority"] and task[1] == "Medium") or
-                     (priority_filter == LANGUAGES[self.language]["low_priority"] and task[1] == "Low")]
-        status_filter = self.filter_status_combo.currentText()
-        if status_filter != LANGUAGES[self.language]["status_filter_options"][0]:
-            if status_filter == LANGUAGES[self.language]["completed"]:
-                tasks = [task for task in tasks if task[3]]
-            elif status_filter == LANGUAGES[self.language]["incomplete"]:
-                tasks = [task for task in tasks if not task[3]]
-        sort_option = self.sort_combo.currentText()
-        if sort_option == LANGUAGES[self.language]["sort_options"][1]:
-            order = {"High": 1, "Medium": 2, "Low": 3}
-            tasks = sorted(tasks, key=lambda x: order.get(x[1], 99))
-        self.tasks_list_widget.clear()
-        for task in tasks:
-            priority_map = {
-                "High": LANGUAGES[self.language]["high_priority"],
-                "Medium": LANGUAGES[self.language]["medium_priority"],
-                "Low": LANGUAGES[self.language]["low_priority"]
-            }
-            prio_display = priority_map.get(task[1], task[1])
-            status_text = LANGUAGES[self.language]["completed"] if task[3] else LANGUAGES[self.language]["incomplete"]
-            s_emoji = status_emojis.get(task[3], "")
-            item_text = f"{task[0]} {priority_emojis.get(task[1], '')} - {prio_display} - {task[2]} - {status_text} {s_emoji}"
-            list_item = QListWidgetItem(item_text)
-            list_item.setData(Qt.UserRole, task[0])
-            self.tasks_list_widget.addItem(list_item)
+        # Mutations reach the view through the model's row signals; this only
+        # pushes the current search/filter/sort state into the model.
+        self.refresh_timer.stop()  # This run covers any refresh still pending
+        self.search_timer.stop()
+        PROFILER.begin("refresh", tasks=len(self.task_list), store=type(self.task_list).__name__)
+        with PROFILER.phase("parse"):
+            query = self.current_query()
+        self.task_model.set_query(query)
+        with PROFILER.phase("explain"):
+            plan = self.task_list.explain(query)
+        self.search_box.setToolTip(plan)
+        if PROFILER.current is not None:
+            PROFILER.note(query=query._asdict(), plan=plan, coalesced=self.coalesced_refreshes)
+            self.profile_timer.start()
+
+    def current_query(self):
+        # Combo indices map to language-neutral values, so the query does not
+        # depend on the language the options are shown in.
+        search_text = self.search_box.text()
+        try:
+            terms = parse_query(search_text)
+            message = None
+        except ValueError as error:
+            terms = [QueryTerm("text", ":", search_text.strip())]
+            message = f"{LANGUAGES[self.language]['query_error']} {error}"
+        # Only the query error is cleared; reminders and save reports stay up
+        if message is not None:
+            self.statusBar().showMessage(message)
+        elif self.query_error is not None and self.statusBar().currentMessage() == self.query_error:
+            self.statusBar().clearMessage()
+        self.query_error = message
+        priority_filter = PRIORITY_FILTERS[max(self.filter_priority_combo.currentIndex(), 0)]
+        status_filter = STATUS_FILTERS[max(self.filter_status_combo.currentIndex(), 0)]
+        date_filter = DATE_FILTERS[max(self.filter_date_combo.currentIndex(), 0)]
+        today = Date.today()
+        if date_filter == "overdue":
+            # Overdue: due before today and not done yet
+            due = (1, today.toordinal())
+            if status_filter is None:
+                status_filter = False
+        elif date_filter == "this_week":
+            week_start = today.toordinal() - today.weekday()
+            due = (week_start, week_start + 7)
+        else:
+            due = None
+        sort = SORT_ORDERS[max(self.sort_combo.currentIndex(), 0)]
+        # The search box terms and the combos feed the same query
+        return compile_query(terms, TaskQuery("", priority_filter, status_filter, due, sort))
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = ToDoApp()
+    # An optional argument names a SQLite file to keep the tasks in
+    arguments = app.arguments()[1:]
+    window = ToDoApp(SQLiteTaskList(arguments[0])) if arguments else ToDoApp(autosave_path=AUTOSAVE_FILE)
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    window.task_list.close()
+    sys.exit(exit_code)
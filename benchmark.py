@@ -0,0 +1,349 @@
+"""Headless benchmarks for TaskList and the task display pipeline.
+
+Runs without a display (Qt offscreen platform) and prints JSON results:
+
+    python benchmark.py --sizes 1000 10000 --output bench.json
+    python benchmark.py --store columnar --trigram --languages Arabic
+    python benchmark.py --fuzzy --sizes 1000000 --no-display
+"""
+import argparse
+import gc
+import glob
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "432.py")
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+MUTATIONS = 1000  # Tasks touched by the single-task add/delete/toggle/edit benchmarks
+SCROLL_FRAMES = 200  # List repaints timed by the scroll benchmark
+THEME_SWITCHES = 20  # Light/dark switches timed by the theme benchmark
+
+# Words used to build synthetic task descriptions, plus a search term that hits some of them
+WORDS = {
+    "English": (["write", "report", "call", "client", "review", "budget", "email", "team",
+                 "plan", "meeting", "fix", "bug", "buy", "groceries", "book", "flight"], "report"),
+    "Arabic": (["كتابة", "تقرير", "اتصال", "عميل", "مراجعة", "ميزانية", "بريد", "فريق",
+                "خطة", "اجتماع", "إصلاح", "خطأ", "شراء", "بقالة", "حجز", "رحلة"], "تقرير"),
+}
+# Misspelled fuzzy searches for the search term above
+FUZZY_SEARCHES = {"English": "~reprot", "Arabic": "~تقرر"}
+PRIORITIES = ["High", "Medium", "Low"]
+
+# (name, search box text: "", "text" or "fuzzy", priority combo index,
+#  status combo index, date combo index, sort combo index)
+DISPLAY_CASES = [
+    ("all", "", 0, 0, 0, 0),
+    ("search", "text", 0, 0, 0, 0),
+    ("fuzzy_search", "fuzzy", 0, 0, 0, 0),
+    ("filter_priority", "", 1, 0, 0, 0),
+    ("filter_status", "", 0, 2, 0, 0),
+    ("filter_overdue", "", 0, 0, 1, 0),
+    ("sort_priority", "", 0, 0, 0, 1),
+    ("sort_date", "", 0, 0, 0, 2),
+    ("search_filter_sort", "text", 1, 2, 0, 3),
+]
+
+def load_app():
+    spec = importlib.util.spec_from_file_location("todo_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_tasks(count, language, seed=432):
+    words, _ = WORDS[language]
+    rng = random.Random(seed)
+    first_day = 739000  # An ordinal in 2024
+    for number in range(count):
+        description = " ".join(rng.choice(words) for _ in range(4)) + f" {number}"
+        day = first_day + rng.randrange(730)
+        yield description, PRIORITIES[number % 3], date.fromordinal(day).isoformat()
+
+def wait_for_rows(model):
+    # Large lists are queried on a worker thread; run the event loop until
+    # every chunk has reached the model
+    from PyQt5.QtWidgets import QApplication
+    while model.loading:
+        QApplication.processEvents()
+
+def measure(function, memory):
+    # Returns (seconds, peak traced bytes or None); memory runs a second,
+    # traced call so tracemalloc overhead never lands in the timing
+    gc.collect()
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+class BenchmarkRun:
+    def __init__(self, app, args):
+        self.app = app
+        self.args = args
+        self.results = []
+
+    def record(self, size, language, name, seconds, peak, operations=1, **details):
+        self.results.append({
+            "size": size,
+            "language": language,
+            "benchmark": name,
+            "seconds": round(seconds, 6),
+            "operations": operations,
+            "seconds_per_operation": round(seconds / operations, 9),
+            "peak_bytes": peak,
+            **details,
+        })
+        print(f"{language:8} {size:>8} {name:34} {seconds * 1000:10.2f} ms", file=sys.stderr)
+
+    def new_task_list(self, path_suffix=""):
+        app = self.app
+        if self.args.store == "sqlite":
+            path = self.args.database + path_suffix
+            for leftover in (path, path + "-wal", path + "-shm"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            return app.SQLiteTaskList(path)
+        store = app.ColumnarTaskList if self.args.store == "columnar" else app.TaskList
+        return store(use_trigram_index=self.args.trigram, use_fuzzy_index=self.args.fuzzy)
+
+    def fill(self, task_list, tasks):
+        for description, priority, day in tasks:
+            task_list.add_task(description, priority, day)
+
+    def run_task_list(self, size, language):
+        tasks = list(synthetic_tasks(size, language))
+        memory = self.args.memory
+        task_list = self.new_task_list()
+        seconds, _ = measure(lambda: self.fill(task_list, tasks), False)
+        peak = None
+        if memory:
+            # Peak while building a second list shows the bytes the structure needs
+            gc.collect()
+            tracemalloc.start()
+            other = self.new_task_list("-memory")
+            self.fill(other, tasks)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            other.close()
+            del other
+        self.record(size, language, "task_list.add_task", seconds, peak, size)
+
+        rng = random.Random(size)
+        ids = [task[4] for task in task_list.get_all_tasks()]
+        sample = rng.sample(ids, min(MUTATIONS, len(ids)))
+
+        seconds, peak = measure(lambda: [task_list.toggle_task_status(task_id) for task_id in sample], memory)
+        self.record(size, language, "task_list.toggle_task_status", seconds, peak, len(sample))
+        seconds, peak = measure(lambda: task_list.toggle_many(ids[::10]), memory)
+        self.record(size, language, "task_list.toggle_many", seconds, peak, len(ids[::10]))
+        seconds, peak = measure(lambda: [task_list.edit_task(task_id, *tasks[(task_id - 1) % size])
+                                         for task_id in sample], memory)
+        self.record(size, language, "task_list.edit_task", seconds, peak, len(sample))
+        seconds, peak = measure(task_list.get_all_tasks, memory)
+        self.record(size, language, "task_list.get_all_tasks", seconds, peak, size)
+        app = self.app
+        query = app.compile_query(app.parse_query(FUZZY_SEARCHES[language]), app.TaskQuery("", None, None, None, None))
+        seconds, peak = measure(lambda: task_list.query_page(query, limit=100), memory)
+        self.record(size, language, "task_list.fuzzy_search", seconds, peak, size)
+        seconds, peak = measure(task_list.next_due, memory)
+        self.record(size, language, "task_list.next_due", seconds, peak)
+        # Not repeatable either: a second call finds nothing left to pop
+        seconds, _ = measure(lambda: task_list.pop_due(date.today().toordinal()), False)
+        self.record(size, language, "task_list.pop_due", seconds, None)
+
+        # Deletes are not repeatable, so the traced run uses a second sample
+        remaining = list(set(ids) - set(sample))
+        doomed = [sample, rng.sample(remaining, min(MUTATIONS, len(remaining)))]
+        seconds, peak = measure(lambda: [task_list.delete_task(task_id) for task_id in doomed.pop(0)], memory)
+        self.record(size, language, "task_list.delete_task", seconds, peak, len(sample))
+        task_list.close()
+
+    def run_display(self, size, language):
+        task_list = self.new_task_list()
+        self.fill(task_list, synthetic_tasks(size, language))
+        window = self.app.ToDoApp(task_list)
+        window.resize(800, 600)
+        window.show()  # So the timed refreshes also format and paint the visible rows
+        wait_for_rows(window.task_model)
+        window.set_language(language)
+        combos = [window.filter_priority_combo, window.filter_status_combo,
+                  window.filter_date_combo, window.sort_combo]
+        search_texts = {"": "", "text": WORDS[language][1], "fuzzy": FUZZY_SEARCHES[language]}
+
+        def apply_state(search, *indexes):
+            for widget in [window.search_box] + combos:
+                widget.blockSignals(True)
+            window.search_box.setText(search_texts[search])
+            for combo, index in zip(combos, indexes):
+                combo.setCurrentIndex(index)
+            for widget in [window.search_box] + combos:
+                widget.blockSignals(False)
+
+        # Each case starts from "completed tasks only", which no case uses, so
+        # the timed refresh always runs a new query instead of returning early
+        start_state = ("", 0, 1, 0, 0)
+        for name, search, *indexes in DISPLAY_CASES:
+            def display():
+                apply_state(*start_state)
+                window.update_task_display()
+                wait_for_rows(window.task_model)
+                window.task_model.row_cache.clear()
+                apply_state(search, *indexes)
+                start = time.perf_counter()
+                window.update_task_display()
+                wait_for_rows(window.task_model)
+                window.tasks_view.viewport().repaint()
+                return time.perf_counter() - start
+            seconds = display()
+            peak = None
+            if self.args.memory:
+                gc.collect()
+                tracemalloc.start()
+                display()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.record(size, language, f"display.{name}", seconds, peak)
+
+        # A language switch refills every combo; the refreshes it asks for
+        # should collapse into one
+        from PyQt5.QtWidgets import QApplication
+        apply_state("", 0, 0, 0, 0)
+        window.update_task_display()
+        wait_for_rows(window.task_model)
+        coalesced = window.coalesced_refreshes
+        other = next(other for other in WORDS if other != language)
+        start = time.perf_counter()
+        for switch_to in (other, language):
+            window.set_language(switch_to)
+            while window.refresh_timer.isActive():
+                QApplication.processEvents()
+            wait_for_rows(window.task_model)
+        self.record(size, language, "display.language_switch", time.perf_counter() - start, None, 2,
+                    coalesced_refreshes=window.coalesced_refreshes - coalesced)
+        window.close()
+        window.deleteLater()
+        task_list.close()
+
+    def run_render(self, size, language):
+        # Scroll frames and theme switches with the normal rendering (shadow,
+        # stylesheets) and with performance rendering, whatever the size
+        from PyQt5.QtWidgets import QApplication
+        task_list = self.new_task_list()
+        self.fill(task_list, synthetic_tasks(size, language))
+        window = self.app.ToDoApp(task_list)
+        window.set_language(language)
+        window.resize(800, 600)
+        window.show()
+        window.update_task_display()
+        wait_for_rows(window.task_model)
+        QApplication.processEvents()
+        scroll_bar = window.tasks_view.verticalScrollBar()
+        viewport = window.tasks_view.viewport()
+        for mode, enabled in (("effects", False), ("performance", True)):
+            window.set_performance_mode(enabled)
+            QApplication.processEvents()
+            step = max(scroll_bar.maximum() // SCROLL_FRAMES, 1)
+            start = time.perf_counter()
+            for frame in range(SCROLL_FRAMES):
+                scroll_bar.setValue(frame * step % (scroll_bar.maximum() + 1))
+                window.repaint()  # Paints synchronously, like a frame during scrolling
+            self.record(size, language, f"render.scroll_frame.{mode}", time.perf_counter() - start, None,
+                        SCROLL_FRAMES)
+            start = time.perf_counter()
+            for switch in range(THEME_SWITCHES):
+                window.dark_mode = not window.dark_mode
+                window.apply_theme()
+                window.repaint()
+            self.record(size, language, f"render.theme_switch.{mode}", time.perf_counter() - start, None,
+                        THEME_SWITCHES)
+        window.close()
+        window.deleteLater()
+        task_list.close()
+
+    def run_startup(self, size, language):
+        # A window opened on an autosave file: time to its first paint, then
+        # to the saved tasks being read in after it
+        from PyQt5.QtWidgets import QApplication
+        from task_store import Autosaver, TaskList
+        path = self.args.database + ".jsonl"
+        self.remove_autosave(path)
+        saved = TaskList()
+        saved.add_many((description, priority, day, False) for description, priority, day in synthetic_tasks(size, language))
+        autosaver = Autosaver(saved, path)
+        autosaver.compact()
+        autosaver.close()
+
+        start = time.perf_counter()
+        window = self.app.ToDoApp(autosave_path=path)
+        window.show()
+        marks = window.startup_marks
+        while "tasks_loaded" not in marks:
+            QApplication.processEvents()
+        self.record(size, language, "startup.first_paint", marks["first_paint"] - start, None)
+        self.record(size, language, "startup.load_tasks", marks["tasks_loaded"] - marks["first_paint"], None, size)
+        window.close()
+        window.deleteLater()
+        self.remove_autosave(path)
+
+    def remove_autosave(self, path):
+        # The file, its temporary copy and its journals
+        for leftover in glob.glob(glob.escape(path) + "*"):
+            os.remove(leftover)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TaskList and the task display pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--languages", nargs="+", choices=sorted(WORDS), default=["English", "Arabic"])
+    parser.add_argument("--store", choices=["linked", "columnar", "sqlite"], default="linked")
+    parser.add_argument("--database", default="benchmark.db", help="SQLite file used with --store sqlite")
+    parser.add_argument("--trigram", action="store_true", help="Build the trigram search index")
+    parser.add_argument("--fuzzy", action="store_true", help="Build the NumPy fuzzy search index")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the traced memory runs")
+    parser.add_argument("--no-display", dest="display", action="store_false", help="Skip the ToDoApp benchmarks")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    from PyQt5.QtWidgets import QApplication
+    qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+    run = BenchmarkRun(load_app(), args)
+    for size in args.sizes:
+        for language in args.languages:
+            run.run_task_list(size, language)
+            if args.display:
+                run.run_display(size, language)
+                run.run_startup(size, language)
+                run.run_render(size, language)
+                qt_app.processEvents()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "store": args.store,
+        "trigram_index": args.trigram,
+        "fuzzy_index": args.fuzzy,
+        "memory_traced": args.memory,
+        "results": run.results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2181 @@
+"""Task storage, search and saving for the To-Do List Manager.
+
+Nothing here imports Qt, so todo_cli.py and batch jobs can use the task
+lists on machines without PyQt5 or a display.
+"""
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import sqlite3
+import time
+import unicodedata
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from heapq import heapify, heappop, heappush, nsmallest
+from itertools import islice
+from datetime import date as Date
+
+try:
+    import numpy
+except ImportError:  # Fuzzy searches then score task by task in Python
+    numpy = None
+
+# -------------------------------
+# Data Structures for Task Management
+# -------------------------------
+PRIORITY_ORDER = {"High": 1, "Medium": 2, "Low": 3}
+PRIORITY_NAMES = {rank: name for name, rank in PRIORITY_ORDER.items()}
+UNDATED = Date.max.toordinal() + 1  # Due key of tasks whose date is not a valid date
+
+# What the task view shows: search is folded with fold_text, priority is
+# "High"/"Medium"/"Low" or None, status is True/False or None, due is a
+# half-open (first, end) range of date ordinals or None, sort is one of
+# SORT_ORDERS or a FuzzyRank and terms holds further folded text that must also appear
+TaskQuery = namedtuple("TaskQuery", "search priority status due sort terms", defaults=((),))
+# Sort value of a fuzzy search: tasks scoring at least FUZZY_MIN_SCORE against
+# the folded text match, best score first (see fuzzy_score)
+FuzzyRank = namedtuple("FuzzyRank", "text")
+FUZZY_MIN_SCORE = 0.4
+# How a store answers a TaskQuery: access names the index that yields the
+# candidate rows, estimate how many it expects, and in_order is True when
+# those candidates already come in display order
+QueryPlan = namedtuple("QueryPlan", "access estimate in_order")
+ACCESS_PATHS = {
+    "text": "trigram index",
+    "text_scan": "substring scan",
+    "priority": "priority index",
+    "status": "status index",
+    "date": "date index",
+    "order": "sort order index",
+    "scan": "scan every task",
+    "fuzzy": "fuzzy index scoring every task",
+    "fuzzy_scan": "fuzzy scoring task by task",
+}
+# None keeps list order; "completed" puts completed tasks last
+SORT_ORDERS = [None, "priority", "date", "priority_date", "completed"]
+# Language-neutral values behind the filter combos, in option order
+PRIORITY_FILTERS = [None, "High", "Medium", "Low"]
+STATUS_FILTERS = [None, True, False]
+# Priority and status labels in each language the app ships; 432.py shows
+# these, and search box queries and imported files accept any of them
+TASK_LABELS = {
+    "English": {"High": "High", "Medium": "Medium", "Low": "Low", True: "Completed", False: "Incomplete"},
+    "Arabic": {"High": "عالي", "Medium": "متوسط", "Low": "منخفض", True: "مكتملة", False: "غير مكتملة"},
+}
+DATE_FILTERS = [None, "overdue", "this_week"]
+
+def fold_text(text):
+    # NFKC maps Arabic presentation forms and other compatibility characters
+    # to their base letters before case folding, so search matches what users type
+    return unicodedata.normalize("NFKC", text).casefold()
+
+# Arabic diacritics and tatweel are dropped and letter variants that are
+# often typed for one another are merged, so they do not count as typos
+FUZZY_LETTERS = str.maketrans({
+    **{chr(code): None for code in range(0x064B, 0x0660)}, "\u0670": None, "\u0640": None,
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+})
+FUZZY_WORD = re.compile(r"\w+")
+
+@lru_cache(maxsize=65536)
+def word_grams(word):
+    # Trigrams of word padded like "  word ", so short words and word starts
+    # still share trigrams with a misspelling
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def fuzzy_grams(folded):
+    return frozenset().union(*map(word_grams, FUZZY_WORD.findall(folded.translate(FUZZY_LETTERS))))
+
+def fuzzy_score(text, folded):
+    # Share of the trigrams of the fuzzy text found in a description, 0 to 1
+    query_grams = fuzzy_grams(text)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & fuzzy_grams(folded)) / len(query_grams)
+
+# Only the exact YYYY-MM-DD form counts as a date; Date.fromisoformat also takes
+# "20250218" and week dates on newer Pythons, which would then be shown rewritten
+ISO_DATE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+
+def date_to_ordinal(text):
+    # Ordinal of a "YYYY-MM-DD" date, or None if text is not such a date
+    match = ISO_DATE.fullmatch(text)
+    if match is None:
+        return None
+    try:
+        return Date(*map(int, match.groups())).toordinal()
+    except ValueError:
+        return None
+
+def task_matches(query, node):
+    if query.search and query.search not in node.folded_description:
+        return False
+    for term in query.terms:
+        if term not in node.folded_description:
+            return False
+    if query.priority is not None and node.priority != query.priority:
+        return False
+    if query.status is not None and node.completed != query.status:
+        return False
+    if query.due is not None and not query.due[0] <= node.due < query.due[1]:
+        return False
+    if isinstance(query.sort, FuzzyRank) and fuzzy_score(query.sort.text, node.folded_description) < FUZZY_MIN_SCORE:
+        return False
+    return True
+
+def due_key(node):
+    return node.due or UNDATED
+
+def sort_key(sort, node):
+    # Total order used by the view and by keyset paging; ids break ties
+    if sort == "priority":
+        return (PRIORITY_ORDER.get(node.priority, 99), node.id)
+    if sort == "date":
+        return (due_key(node), node.id)
+    if sort == "priority_date":
+        return (PRIORITY_ORDER.get(node.priority, 99), due_key(node), node.id)
+    if sort == "completed":
+        return (int(node.completed), node.id)
+    if isinstance(sort, FuzzyRank):
+        return (-fuzzy_score(sort.text, node.folded_description), node.id)
+    return (node.id,)
+
+def describe_due(due):
+    first, end = due
+    if first >= end:
+        return "never (contradictory terms)"
+    low = Date.fromordinal(first).isoformat() if first > 1 else "any date"
+    high = Date.fromordinal(end - 1).isoformat() if end < UNDATED else "any date"
+    return f"{low} to {high}"
+
+def explain_plan(store, size, plan, query):
+    # Readable account of plan, for the explain output of the stores
+    conditions = {}
+    texts = ([query.search] if query.search else []) + list(query.terms)
+    if texts:
+        conditions["text"] = "text " + " and ".join(repr(text) for text in texts)
+    if query.priority is not None:
+        conditions["priority"] = f"priority {query.priority}"
+    if query.status is not None:
+        conditions["status"] = "status " + ("done" if query.status else "open")
+    if query.due is not None:
+        conditions["date"] = "due " + describe_due(query.due)
+    lines = [f"{store}: {size} tasks"]
+    served = conditions.pop("text" if plan.access == "text_scan" else plan.access, None)
+    access = ACCESS_PATHS[plan.access] + (f" for {served}" if served else "")
+    lines.append(f"access: {access}, about {plan.estimate} candidate rows")
+    lines.append("residual: " + (", ".join(conditions.values()) or "none"))
+    if isinstance(query.sort, FuzzyRank):
+        order = f"best fuzzy match for {query.sort.text!r}, score at least {FUZZY_MIN_SCORE}"
+    else:
+        order = query.sort or "list order"
+    lines.append("order: " + order + ("" if plan.in_order else " (sorted after filtering)"))
+    return "\n".join(lines)
+
+def fuzzy_page(query, after, limit, fuzzy_index, get_node, nodes):
+    """query_page for a query sorted by FuzzyRank.
+
+    With a FuzzyIndex every task is scored at once and only the best
+    candidates are looked up and checked against the other conditions;
+    without one, nodes (every task) are scored one by one.
+    """
+    if fuzzy_index is not None:
+        residual = query._replace(sort=None)
+        task_ids = []
+        for task_id in fuzzy_index.rank(query.sort.text, FUZZY_MIN_SCORE, after).tolist():
+            if limit is not None and len(task_ids) >= limit:
+                break
+            node = get_node(task_id)
+            if node is not None and task_matches(residual, node):
+                task_ids.append(task_id)
+        return task_ids
+    matched = sorted((node for node in nodes if task_matches(query, node)), key=lambda node: sort_key(query.sort, node))
+    if after is not None:
+        matched = [node for node in matched if sort_key(query.sort, node) > after]
+    return [node.id for node in islice(matched, limit)]
+
+class SortedKeyList:
+    """A sorted list stored as short sorted sublists.
+
+    insort into one flat list moves every later item, which is O(N) per
+    insert and dominates at a million tasks; here an insert or removal only
+    moves items inside one sublist of at most 2 * load entries. copy() shares
+    the sublists and either side copies one before its first change to it.
+    """
+
+    load = 500
+
+    def __init__(self):
+        self.lists = []  # Sorted sublists, each non-empty
+        self.maxes = []  # Last value of each sublist, for bisecting to the right one
+        self.owned = []  # False for a sublist still shared with a copy
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value):
+        lists, maxes = self.lists, self.maxes
+        self.size += 1
+        if not maxes:
+            lists.append([value])
+            maxes.append(value)
+            self.owned.append(True)
+            return
+        index = bisect_left(maxes, value)
+        if index == len(maxes):
+            index -= 1
+            self.own(index).append(value)  # Past the end, the common case for new ids
+            maxes[index] = value
+        else:
+            insort(self.own(index), value)
+        sublist = lists[index]
+        if len(sublist) > 2 * self.load:
+            lists.insert(index + 1, sublist[self.load:])
+            self.owned.insert(index + 1, True)
+            del sublist[self.load:]
+            maxes.insert(index, sublist[-1])
+
+    def remove(self, value):
+        # Remove value if present
+        lists, maxes = self.lists, self.maxes
+        index = bisect_left(maxes, value)
+        if index == len(maxes):
+            return
+        position = bisect_left(lists[index], value)
+        if lists[index][position] != value:
+            return
+        sublist = self.own(index)
+        del sublist[position]
+        self.size -= 1
+        if not sublist:
+            del lists[index]
+            del maxes[index]
+            del self.owned[index]
+        elif position == len(sublist):
+            maxes[index] = sublist[-1]
+
+    def own(self, index):
+        # The sublist at index, copied first if a copy still shares it
+        if not self.owned[index]:
+            self.lists[index] = list(self.lists[index])
+            self.owned[index] = True
+        return self.lists[index]
+
+    def irange(self, low=None, high=None, low_exclusive=False):
+        # Values from low (inclusive unless low_exclusive) up to but excluding high
+        lists, maxes = self.lists, self.maxes
+        index = position = 0
+        if low is not None:
+            find = bisect_right if low_exclusive else bisect_left
+            index = find(maxes, low)
+            if index == len(maxes):
+                return
+            position = find(lists[index], low)
+        for sublist in islice(lists, index, None):
+            for value in islice(sublist, position, None):
+                if high is not None and value >= high:
+                    return
+                yield value
+            position = 0
+
+    def __iter__(self):
+        return self.irange()
+
+    def position(self, value):
+        # Number of values less than value
+        index = bisect_left(self.maxes, value)
+        if index == len(self.maxes):
+            return self.size
+        return sum(len(sublist) for sublist in islice(self.lists, index)) + bisect_left(self.lists[index], value)
+
+    def count(self, low, high):
+        # Number of values from low up to but excluding high
+        return max(self.position(high) - self.position(low), 0)
+
+    def copy(self):
+        # O(len / load): only the list of sublists is copied
+        other = SortedKeyList()
+        other.lists = list(self.lists)
+        other.maxes = list(self.maxes)
+        self.owned = [False] * len(self.lists)
+        other.owned = list(self.owned)
+        other.size = self.size
+        return other
+
+class SortedIndex:
+    """The sort keys of every task for one sort order, kept in a SortedKeyList."""
+
+    def __init__(self, sort):
+        self.sort = sort
+        self.entries = SortedKeyList()
+
+    def add(self, node):
+        self.entries.add(sort_key(self.sort, node))
+
+    def remove(self, node):
+        self.entries.remove(sort_key(self.sort, node))
+
+    def ids(self, after=None):
+        return (entry[-1] for entry in self.entries.irange(after, low_exclusive=True))
+
+    def range_ids(self, due, after=None):
+        # Ids of a (due key, id) index inside the due range and past after
+        first, end = due if due is not None else (0, UNDATED + 1)
+        if after is not None and after >= (first,):
+            entries = self.entries.irange(after, (end,), low_exclusive=True)
+        else:
+            entries = self.entries.irange((first,), (end,))
+        return (task_id for _, task_id in entries)
+
+    def copy(self):
+        other = SortedIndex(self.sort)
+        other.entries = self.entries.copy()
+        return other
+
+class PriorityBuckets:
+    """Task ids per priority rank, each bucket in id order."""
+
+    def __init__(self):
+        self.buckets = {}  # Rank -> SortedKeyList of ids
+
+    def add(self, node):
+        self.buckets.setdefault(PRIORITY_ORDER.get(node.priority, 99), SortedKeyList()).add(node.id)
+
+    def remove(self, node):
+        bucket = self.buckets.get(PRIORITY_ORDER.get(node.priority, 99))
+        if bucket is not None:
+            bucket.remove(node.id)
+
+    def ids(self, after=None):
+        for rank in sorted(self.buckets):
+            bucket = self.buckets[rank]
+            if after is None or rank > after[0]:
+                yield from bucket
+            elif rank == after[0]:
+                yield from bucket.irange(after[1], low_exclusive=True)
+
+    def copy(self):
+        other = PriorityBuckets()
+        other.buckets = {rank: bucket.copy() for rank, bucket in self.buckets.items()}
+        return other
+
+class TaskCounts:
+    """Task totals per priority, per status and per (priority, status) pair.
+
+    Stores call add() with delta 1 or -1 as tasks come, go or change, so
+    every count is kept in O(1) instead of being recomputed by a scan.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.priorities = {}                 # Priority -> count
+        self.statuses = {True: 0, False: 0}  # Completed flag -> count
+        self.pairs = {}                      # (priority, completed) -> count
+
+    def add(self, priority, completed, delta=1):
+        completed = bool(completed)
+        self.total += delta
+        self.priorities[priority] = self.priorities.get(priority, 0) + delta
+        self.statuses[completed] += delta
+        self.pairs[(priority, completed)] = self.pairs.get((priority, completed), 0) + delta
+
+    def priority(self, priority=None):
+        # Tasks with this priority, or all tasks for None
+        return self.total if priority is None else self.priorities.get(priority, 0)
+
+    def status(self, completed=None):
+        return self.total if completed is None else self.statuses[bool(completed)]
+
+    def pair(self, priority, completed):
+        return self.pairs.get((priority, bool(completed)), 0)
+
+    def copy(self):
+        other = TaskCounts()
+        other.total = self.total
+        other.priorities = dict(self.priorities)
+        other.statuses = dict(self.statuses)
+        other.pairs = dict(self.pairs)
+        return other
+
+    def as_dict(self):
+        # Plain data for tooling, e.g. json.dumps(task_list.counts.as_dict())
+        status_names = {True: "completed", False: "incomplete"}
+        return {
+            "total": self.total,
+            "priority": {priority: count for priority, count in self.priorities.items() if count},
+            "status": {status_names[completed]: count for completed, count in self.statuses.items()},
+            "priority_status": {f"{priority}/{status_names[completed]}": count
+                                for (priority, completed), count in self.pairs.items() if count},
+        }
+
+class ReminderQueue:
+    """Incomplete tasks not reminded of yet, in a min-heap by due ordinal.
+
+    Stores add() a task when it is added or changes and remove() it
+    before, so a change costs O(log N). A removal only forgets the task's
+    live due date; its heap entry stays until it reaches the top and is
+    found stale, or until stale entries outnumber live ones and the heap
+    is rebuilt. Tasks due on or before the last day passed to pop_due()
+    are not queued again: they show as overdue instead.
+    """
+
+    def __init__(self):
+        self.heap = []             # (due ordinal, task id), possibly stale
+        self.due = {}              # Task id -> due ordinal of its live entry
+        self.reminded_through = 0  # Last day pop_due() was called for
+
+    def add(self, task_id, due):
+        if due > self.reminded_through:
+            self.due[task_id] = due
+            heappush(self.heap, (due, task_id))
+
+    def remove(self, task_id):
+        if self.due.pop(task_id, None) is not None and len(self.heap) > 2 * len(self.due) + 64:
+            self.heap = [(due, task_id) for task_id, due in self.due.items()]
+            heapify(self.heap)
+
+    def next_due(self):
+        # Earliest due ordinal still queued, or None
+        heap = self.heap
+        while heap and self.due.get(heap[0][1]) != heap[0][0]:
+            heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, day):
+        # Ids of the queued tasks due on or before day, earliest first
+        task_ids = []
+        while True:
+            due = self.next_due()
+            if due is None or due > day:
+                break
+            task_id = heappop(self.heap)[1]
+            del self.due[task_id]
+            task_ids.append(task_id)
+        self.reminded_through = max(self.reminded_through, day)
+        return task_ids
+
+class TaskNode:
+    __slots__ = ("id", "description", "folded_description", "priority", "date", "due", "completed", "prev", "next")
+
+    def __init__(self, task_id, description, priority, date):
+        self.id = task_id                # Stable unique id (never reused)
+        self.description = description   # Task description
+        self.folded_description = fold_text(description)  # Cached for case-insensitive search
+        self.priority = priority         # Priority: High, Medium, Low
+        self.date = date                 # Date as a string (e.g., "2025-02-18")
+        self.due = date_to_ordinal(date) or 0  # Date parsed once into an ordinal (0 if invalid)
+        self.completed = False           # Completion status
+        self.prev = None                 # Pointer to the previous task
+        self.next = None                 # Pointer to the next task
+
+    def copy(self):
+        node = TaskNode.__new__(TaskNode)
+        node.id, node.description, node.folded_description = self.id, self.description, self.folded_description
+        node.priority, node.date, node.due, node.completed = self.priority, self.date, self.due, self.completed
+        node.prev, node.next = self.prev, self.next
+        return node
+
+class TrigramIndex:
+    """Inverted index from every 3-character substring to the ids of the tasks containing it."""
+
+    def __init__(self):
+        self.postings = {}  # Trigram -> set of task ids
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, task_id, text):
+        for gram in self.trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                self.postings[gram] = {task_id}
+            else:
+                posting.add(task_id)
+
+    def remove(self, task_id, text):
+        for gram in self.trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(task_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def estimate(self, query):
+        # Upper bound on the candidates for query, None when it is too short
+        grams = self.trigrams(query)
+        if not grams:
+            return None
+        return min(len(self.postings.get(gram, ())) for gram in grams)
+
+    def candidates(self, query):
+        # Returns None when the query is too short to use the index
+        grams = self.trigrams(query)
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+    def copy(self):
+        other = TrigramIndex()
+        other.postings = {gram: set(posting) for gram, posting in self.postings.items()}
+        return other
+
+FUZZY_CHUNK_SLOTS = 1 << 16  # Tasks scored per NumPy pass, which bounds the temporary arrays
+FUZZY_PARALLEL_MIN = 1 << 18  # From this many tasks on, chunks are scored on FUZZY_THREADS threads
+FUZZY_THREADS = min(4, os.cpu_count() or 1)
+FUZZY_COMPACT_MIN = 1 << 16  # Dead trigrams tolerated before compact() is considered
+fuzzy_pool = None  # ThreadPoolExecutor shared by all FuzzyIndexes, created on first use
+
+def grown(values, size):
+    # values, or a copy with room for at least size items (doubling)
+    if size <= len(values):
+        return values
+    larger = numpy.zeros(max(size, 2 * len(values), 1024), values.dtype)
+    larger[:len(values)] = values
+    return larger
+
+class FuzzyIndex:
+    """fuzzy_grams of every task packed into NumPy arrays for fuzzy_score.
+
+    Each task owns a run of trigram ids in one flat array, recorded by its
+    slot's start and length. A changed description gets a new slot at the
+    end and a deleted task's run is only zeroed, so runs stay in slot order
+    and compact() drops the dead ones once they make up half the array.
+    New tasks collect in plain arrays and reach NumPy in flush().
+
+    rank() marks the query's trigrams in a lookup table, gathers it over
+    the flat array and turns a cumulative sum into each task's overlap,
+    with no Python loop over tasks. The arrays are only written past the
+    end already flushed, or replaced, so a copy() can be ranked on a
+    worker thread while the original keeps changing.
+    """
+
+    def __init__(self):
+        self.vocabulary = {}  # Trigram -> id
+        self.word_ids = {}    # Word -> ids of its word_grams
+        self.slots = {}       # Task id -> slot
+        self.grams = numpy.zeros(0, numpy.int32)     # Trigram ids of all runs
+        self.starts = numpy.zeros(0, numpy.int64)    # Per slot: first position of its run
+        self.lengths = numpy.zeros(0, numpy.int32)   # Per slot: run length, 0 once dead
+        self.task_ids = numpy.zeros(0, numpy.int64)  # Per slot: task id, 0 once dead
+        self.slot_count = self.used = 0              # Slots and trigrams, flushed or not
+        self.flushed_slots = self.flushed_used = 0
+        self.pending_grams = array("i")
+        self.pending_lengths = array("i")
+        self.pending_ids = array("q")
+        self.dead = 0                                # Trigrams in dead runs
+
+    def add(self, task_id, folded):
+        word_ids = self.word_ids
+        grams = set()
+        for word in FUZZY_WORD.findall(folded.translate(FUZZY_LETTERS)):
+            ids = word_ids.get(word)
+            if ids is None:
+                vocabulary = self.vocabulary
+                ids = word_ids[word] = tuple(vocabulary.setdefault(gram, len(vocabulary)) for gram in word_grams(word))
+            grams.update(ids)
+        self.slots[task_id] = self.slot_count
+        self.slot_count += 1
+        self.used += len(grams)
+        self.pending_grams.extend(grams)
+        self.pending_lengths.append(len(grams))
+        self.pending_ids.append(task_id)
+
+    def remove(self, task_id):
+        slot = self.slots.pop(task_id, None)
+        if slot is None:
+            return
+        if slot >= self.flushed_slots:
+            # The length still places the later pending runs; flush() zeroes it
+            self.dead += self.pending_lengths[slot - self.flushed_slots]
+            self.pending_ids[slot - self.flushed_slots] = 0
+        else:
+            self.dead += int(self.lengths[slot])
+            self.lengths[slot] = 0
+            self.task_ids[slot] = 0
+        if self.dead >= FUZZY_COMPACT_MIN and self.dead * 2 > self.used:
+            self.compact()
+
+    def flush(self):
+        if self.slot_count == self.flushed_slots:
+            return
+        lengths = numpy.frombuffer(self.pending_lengths, numpy.int32)
+        task_ids = numpy.frombuffer(self.pending_ids, numpy.int64)
+        starts = numpy.zeros(len(lengths), numpy.int64)
+        numpy.cumsum(lengths[:-1], out=starts[1:])
+        starts += self.flushed_used
+        self.grams = grown(self.grams, self.used)
+        self.grams[self.flushed_used:self.used] = numpy.frombuffer(self.pending_grams, numpy.int32)
+        for name, values in (("starts", starts), ("lengths", numpy.where(task_ids != 0, lengths, 0)),
+                             ("task_ids", task_ids)):
+            column = grown(getattr(self, name), self.slot_count)
+            column[self.flushed_slots:self.slot_count] = values
+            setattr(self, name, column)
+        self.pending_grams, self.pending_lengths, self.pending_ids = array("i"), array("i"), array("q")
+        self.flushed_slots, self.flushed_used = self.slot_count, self.used
+
+    def compact(self):
+        # Copy the live runs into new arrays; copies being ranked keep the old ones
+        self.flush()
+        live = numpy.nonzero(self.task_ids[:self.slot_count])[0]
+        lengths = self.lengths[live]
+        starts = numpy.zeros(len(live), numpy.int64)
+        numpy.cumsum(lengths[:-1], out=starts[1:])
+        self.used = int(lengths.sum())
+        positions = numpy.repeat(self.starts[live] - starts, lengths) + numpy.arange(self.used)
+        self.grams = self.grams[positions]
+        self.starts, self.lengths, self.task_ids = starts, lengths, self.task_ids[live]
+        self.slots = dict(zip(self.task_ids.tolist(), range(len(live))))
+        self.slot_count = self.flushed_slots = len(live)
+        self.flushed_used = self.used
+        self.dead = 0
+
+    def copy(self):
+        self.flush()
+        other = FuzzyIndex.__new__(FuzzyIndex)
+        other.__dict__.update(self.__dict__)
+        # The only arrays written in place below the flushed end
+        other.lengths = self.lengths[:self.slot_count].copy()
+        other.task_ids = self.task_ids[:self.slot_count].copy()
+        other.pending_grams, other.pending_lengths, other.pending_ids = array("i"), array("i"), array("q")
+        return other
+
+    def rank(self, text, min_score, after=None):
+        """Ids of the tasks with fuzzy_score(text) >= min_score, best first.
+
+        Ties go to the lower id, as in sort_key; after skips keys up to and
+        including it.
+        """
+        self.flush()
+        query_grams = fuzzy_grams(text)
+        if not query_grams or not self.slot_count:
+            return numpy.zeros(0, numpy.int64)
+        lookup = numpy.zeros(len(self.vocabulary) + 1, bool)
+        lookup[[self.vocabulary[gram] for gram in query_grams if gram in self.vocabulary]] = True
+        bounds = list(range(0, self.slot_count, FUZZY_CHUNK_SLOTS)) + [self.slot_count]
+        chunks = list(zip(bounds, bounds[1:]))
+        if self.slot_count >= FUZZY_PARALLEL_MIN and FUZZY_THREADS > 1:
+            # NumPy releases the GIL in the gather and the cumulative sum
+            global fuzzy_pool
+            if fuzzy_pool is None:
+                fuzzy_pool = ThreadPoolExecutor(max_workers=FUZZY_THREADS)
+            overlaps = list(fuzzy_pool.map(lambda chunk: self.overlaps(lookup, *chunk), chunks))
+        else:
+            overlaps = [self.overlaps(lookup, *chunk) for chunk in chunks]
+        scores = numpy.concatenate(overlaps) / len(query_grams)
+        task_ids = self.task_ids[:self.slot_count]
+        keep = scores >= min_score
+        if after is not None:
+            keep &= (-scores > after[0]) | ((-scores == after[0]) & (task_ids > after[1]))
+        scores, task_ids = scores[keep], task_ids[keep]
+        return task_ids[numpy.lexsort((task_ids, -scores))]
+
+    def overlaps(self, lookup, first, end):
+        # Query trigrams found in each run of slots first to end - 1
+        starts = self.starts[first:end]
+        low = int(starts[0])
+        high = int(self.starts[end]) if end < self.slot_count else self.used
+        found = numpy.zeros(high - low + 1, numpy.int32)
+        numpy.cumsum(lookup[self.grams[low:high]], dtype=numpy.int32, out=found[1:])
+        offsets = starts - low
+        return found[offsets + self.lengths[first:end]] - found[offsets]
+
+class TaskList:
+    page_size = None  # Everything is in memory, so the view loads results in one go
+
+    def __init__(self, use_trigram_index=False, use_fuzzy_index=False):
+        self.head = None   # Start of the linked list
+        self.tail = None   # End of the linked list (O(1) append)
+        self.nodes = {}    # Task id -> TaskNode index (O(1) lookup)
+        self.next_id = 1   # Next id to hand out
+        self.listeners = []  # Callbacks notified as listener(event, task_ids)
+        self.trigram_index = TrigramIndex() if use_trigram_index else None
+        # Needs NumPy; without it fuzzy searches score the nodes one by one
+        self.fuzzy_index = FuzzyIndex() if use_fuzzy_index and numpy is not None else None
+        # Sort orders kept up to date on every change, so a sorted page is read, not sorted
+        self.priority_buckets = PriorityBuckets()
+        self.sort_indexes = {sort: SortedIndex(sort) for sort in ("date", "priority_date", "completed")}
+        self.counts = TaskCounts()
+        self.reminders = ReminderQueue()
+        self.versions = weakref.WeakSet()  # NodeVersions of the snapshots still in use
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def index_node(self, node):
+        # Every add, edit, toggle and delete passes through here and unindex_node
+        self.counts.add(node.priority, node.completed)
+        self.priority_buckets.add(node)
+        for index in self.sort_indexes.values():
+            index.add(node)
+        if not node.completed:
+            self.reminders.add(node.id, node.due)
+
+    def unindex_node(self, node):
+        # Runs before the node or any index changes, so snapshots keep the node first
+        for versions in self.versions:
+            versions.keep(node)
+        self.counts.add(node.priority, node.completed, -1)
+        self.reminders.remove(node.id)
+        self.priority_buckets.remove(node)
+        for index in self.sort_indexes.values():
+            index.remove(node)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, event, task_ids):
+        # event is one of "added", "removed" or "changed"
+        if task_ids:
+            for listener in self.listeners:
+                listener(event, task_ids)
+
+    def add_task(self, description, priority, date):
+        task_id = self.append_task(description, priority, date)
+        self.notify("added", [task_id])
+        return task_id
+
+    def add_many(self, tasks):
+        # tasks yields (description, priority, date, completed); one "added"
+        # notification covers them all, including those added before an error
+        task_ids = []
+        try:
+            for task in tasks:
+                task_ids.append(self.append_task(*task))
+        finally:
+            self.notify("added", task_ids)
+        return task_ids
+
+    def append_task(self, description, priority, date, completed=False, task_id=None):
+        # task_id keeps a saved id; ids only grow, so list order stays id order
+        if task_id is None:
+            task_id = self.next_id
+        elif task_id < self.next_id:
+            raise ValueError(f"Task id {task_id} is already used")
+        new_task = TaskNode(task_id, description, priority, date)
+        new_task.completed = bool(completed)
+        self.next_id = task_id + 1
+        if not self.head:
+            self.head = new_task
+        else:
+            new_task.prev = self.tail
+            self.tail.next = new_task
+        self.tail = new_task
+        self.nodes[new_task.id] = new_task
+        self.index_node(new_task)
+        if self.trigram_index is not None:
+            self.trigram_index.add(new_task.id, new_task.folded_description)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(new_task.id, new_task.folded_description)
+        return new_task.id
+
+    def delete_task(self, task_id):
+        if self.unlink(task_id):
+            self.notify("removed", [task_id])
+
+    def unlink(self, task_id):
+        node = self.nodes.get(task_id)
+        if node is None:
+            return False
+        self.unindex_node(node)
+        del self.nodes[task_id]
+        if self.trigram_index is not None:
+            self.trigram_index.remove(task_id, node.folded_description)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.remove(task_id)
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+        return True
+
+    def replace_node(self, node):
+        # The task fields of a stored node are never changed, so snapshots
+        # that hold it stay consistent; edits go to a copy linked in its place
+        new_node = node.copy()
+        if node.prev:
+            node.prev.next = new_node
+        else:
+            self.head = new_node
+        if node.next:
+            node.next.prev = new_node
+        else:
+            self.tail = new_node
+        node.prev = node.next = None
+        self.nodes[node.id] = new_node
+        return new_node
+
+    def toggle_task_status(self, task_id):
+        node = self.nodes.get(task_id)
+        if node is not None:
+            self.unindex_node(node)
+            node = self.replace_node(node)
+            node.completed = not node.completed
+            self.index_node(node)
+            self.notify("changed", [task_id])
+
+    def edit_task(self, task_id, new_description, new_priority, new_date):
+        node = self.nodes.get(task_id)
+        if node is not None:
+            self.unindex_node(node)
+            folded = fold_text(new_description)
+            if self.trigram_index is not None and folded != node.folded_description:
+                self.trigram_index.remove(task_id, node.folded_description)
+                self.trigram_index.add(task_id, folded)
+            if self.fuzzy_index is not None and folded != node.folded_description:
+                self.fuzzy_index.remove(task_id)
+                self.fuzzy_index.add(task_id, folded)
+            node = self.replace_node(node)
+            node.description = new_description
+            node.folded_description = folded
+            node.priority = new_priority
+            node.date = new_date
+            node.due = date_to_ordinal(new_date) or 0
+            self.index_node(node)
+            self.notify("changed", [task_id])
+
+    def delete_many(self, task_ids):
+        removed = [task_id for task_id in set(task_ids) if self.unlink(task_id)]
+        self.notify("removed", removed)
+
+    def toggle_many(self, task_ids):
+        changed = []
+        for task_id in set(task_ids):
+            node = self.nodes.get(task_id)
+            if node is not None:
+                self.unindex_node(node)
+                node = self.replace_node(node)
+                node.completed = not node.completed
+                self.index_node(node)
+                changed.append(task_id)
+        self.notify("changed", changed)
+
+    def set_completed_many(self, task_ids, value):
+        changed = []
+        for task_id in set(task_ids):
+            node = self.nodes.get(task_id)
+            if node is not None and node.completed != value:
+                self.unindex_node(node)
+                node = self.replace_node(node)
+                node.completed = value
+                self.index_node(node)
+                changed.append(task_id)
+        self.notify("changed", changed)
+
+    def next_due(self):
+        # Due ordinal of the next incomplete task to remind of, or None
+        return self.reminders.next_due()
+
+    def pop_due(self, day):
+        # Ids of the incomplete tasks due on or before day that were not
+        # reminded of yet; they are not returned again
+        return self.reminders.pop_due(day)
+
+    def get_node(self, task_id):
+        return self.nodes.get(task_id)
+
+    def get_task(self, task_id):
+        node = self.nodes.get(task_id)
+        if node is None:
+            return None
+        return (node.description, node.priority, node.date, node.completed, node.id)
+
+    def get_all_tasks(self):
+        tasks = []
+        current = self.head
+        while current:
+            tasks.append((current.description, current.priority, current.date, current.completed, current.id))
+            current = current.next
+        return tasks
+
+    def search(self, query):
+        # query must already be folded with fold_text; returns ids in list order
+        if self.trigram_index is not None:
+            candidates = self.trigram_index.candidates(query)
+            if candidates is not None:
+                nodes = self.nodes
+                return sorted(task_id for task_id in candidates if query in nodes[task_id].folded_description)
+        return [node.id for node in self.iter_nodes() if query in node.folded_description]
+
+    def plan(self, query):
+        # Take candidates from the index expected to yield the fewest rows;
+        # task_matches checks the remaining conditions on those rows only
+        if isinstance(query.sort, FuzzyRank):
+            return QueryPlan("fuzzy" if self.fuzzy_index is not None else "fuzzy_scan", len(self.nodes), True)
+        options = []
+        if query.search and self.trigram_index is not None:
+            estimate = self.trigram_index.estimate(query.search)
+            if estimate is not None:
+                options.append((estimate, "text"))
+        if query.priority is not None:
+            bucket = self.priority_buckets.buckets.get(PRIORITY_ORDER.get(query.priority, 99))
+            options.append((len(bucket) if bucket is not None else 0, "priority"))
+        if query.status is not None:
+            status = int(query.status)
+            options.append((self.sort_indexes["completed"].entries.count((status,), (status + 1,)), "status"))
+        if query.due is not None:
+            first, end = query.due
+            options.append((self.sort_indexes["date"].entries.count((first,), (end,)), "date"))
+        estimate, access = min(options, key=lambda option: option[0], default=(len(self.nodes), "order"))
+        in_order = (query.sort is None and access != "date") or (access, query.sort) in (
+            ("priority", "priority"), ("status", "completed"), ("date", "date"))
+        if estimate >= len(self.nodes) or (not in_order and estimate * 4 >= len(self.nodes)):
+            # Too little is narrowed down to pay for sorting the candidates:
+            # walk the list in display order and stop at the limit instead
+            return QueryPlan("order", len(self.nodes), True)
+        return QueryPlan(access, estimate, in_order)
+
+    def candidate_ids(self, plan, query, after=None):
+        # Ids from the plan's access path; after only seeks indexes already in display order
+        seek = after if plan.in_order else None
+        if plan.access == "text":
+            return sorted(self.trigram_index.candidates(query.search))
+        if plan.access == "priority":
+            bucket = self.priority_buckets.buckets.get(PRIORITY_ORDER.get(query.priority, 99), SortedKeyList())
+            return bucket.irange(seek[-1], low_exclusive=True) if seek is not None else iter(bucket)
+        if plan.access == "status":
+            status = int(query.status)
+            entries = self.sort_indexes["completed"].entries
+            if seek is not None:
+                entries = entries.irange((status, seek[-1]), (status + 1,), low_exclusive=True)
+            else:
+                entries = entries.irange((status,), (status + 1,))
+            return (task_id for _, task_id in entries)
+        if plan.access == "date":
+            return self.sort_indexes["date"].range_ids(query.due, seek)
+        if query.sort is None:
+            return (node.id for node in self.iter_nodes())
+        return self.ordered_ids(query.sort, after)
+
+    def query_page(self, query, after=None, limit=None):
+        # Ids matching query in display order whose sort key is greater than after
+        if isinstance(query.sort, FuzzyRank):
+            return fuzzy_page(query, after, limit, self.fuzzy_index, self.nodes.get, self.iter_nodes())
+        plan = self.plan(query)
+        nodes = (self.nodes[task_id] for task_id in self.candidate_ids(plan, query, after))
+        nodes = (node for node in nodes if task_matches(query, node))
+        if not plan.in_order:
+            nodes = sorted(nodes, key=lambda node: sort_key(query.sort, node))
+        if after is not None:
+            nodes = (node for node in nodes if sort_key(query.sort, node) > after)
+        return [node.id for node in islice(nodes, limit)]
+
+    def explain(self, query):
+        return explain_plan(type(self).__name__, len(self), self.plan(query), query)
+
+    def ordered_ids(self, sort, after=None):
+        # Ids in a maintained sort order, starting after the given sort key
+        if sort == "priority":
+            return self.priority_buckets.ids(after)
+        return self.sort_indexes[sort].ids(after)
+
+    def iter_nodes(self):
+        current = self.head
+        while current:
+            yield current
+            current = current.next
+
+    def snapshot(self, indexes=True):
+        return TaskSnapshot(self, indexes)
+
+    def close(self):
+        pass
+
+class NodeVersions:
+    """The nodes of a TaskList as they were when this was made, read from a worker thread.
+
+    Nothing is copied up front: the list's own dict is read, and the list
+    hands every node to keep() before it replaces or removes it. Tasks
+    added later have ids from next_id on and are left out.
+    """
+
+    def __init__(self, task_list):
+        self.live = task_list.nodes
+        self.old = {}  # Task id -> node as it was, for tasks changed or removed since
+        self.next_id = task_list.next_id
+        self.count = len(task_list.nodes)
+        task_list.versions.add(self)
+
+    def keep(self, node):
+        # Called on the list's thread before node is replaced or removed
+        if node.id < self.next_id:
+            self.old.setdefault(node.id, node)
+
+    def get(self, task_id, default=None):
+        if task_id >= self.next_id:
+            return default
+        # The live dict is read first: a node replaced after that read is in old by now
+        node = self.live.get(task_id)
+        node = self.old.get(task_id, node)
+        return default if node is None else node
+
+    def __getitem__(self, task_id):
+        node = self.get(task_id)
+        if node is None:
+            raise KeyError(task_id)
+        return node
+
+    def __len__(self):
+        return self.count
+
+    def values(self):
+        # Ids follow list order, since tasks are only ever appended
+        return filter(None, map(self.get, range(1, self.next_id)))
+
+class SnapshotTrigrams:
+    """A live TrigramIndex read for a snapshot with the given NodeVersions.
+
+    Tasks changed since the snapshot are added to every candidate set and
+    tasks added since are dropped; the caller checks each candidate's text.
+    """
+
+    def __init__(self, index, versions):
+        self.index = index
+        self.versions = versions
+
+    def estimate(self, query):
+        return self.index.estimate(query)
+
+    def candidates(self, query):
+        candidates = self.index.candidates(query)
+        if candidates is None:
+            return None
+        next_id = self.versions.next_id
+        candidates = {task_id for task_id in candidates if task_id < next_id}
+        candidates.update(self.versions.old)  # Read after the index, see NodeVersions.get
+        return candidates
+
+class TaskSnapshot:
+    """The tasks of a TaskList at one moment, safe to query from a worker thread.
+
+    Taking one is close to O(1): nodes are read through NodeVersions, the
+    sort indexes are copy-on-write copies and the trigram index is read
+    live. Queries take the same plans and pages as on the list.
+    """
+
+    def __init__(self, task_list, indexes=True):
+        self.nodes = NodeVersions(task_list)
+        self.trigram_index = self.fuzzy_index = self.priority_buckets = None
+        self.sort_indexes = {}
+        if not indexes:
+            return  # Only for get_node and iter_nodes, as when saving
+        if task_list.trigram_index is not None:
+            self.trigram_index = SnapshotTrigrams(task_list.trigram_index, self.nodes)
+        if task_list.fuzzy_index is not None:
+            self.fuzzy_index = task_list.fuzzy_index.copy()
+        self.priority_buckets = task_list.priority_buckets.copy()
+        self.sort_indexes = {sort: index.copy() for sort, index in task_list.sort_indexes.items()}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    get_node = TaskList.get_node
+    plan = TaskList.plan
+    candidate_ids = TaskList.candidate_ids
+    query_page = TaskList.query_page
+    explain = TaskList.explain
+    ordered_ids = TaskList.ordered_ids
+
+    def iter_nodes(self):
+        return iter(self.nodes.values())
+
+# -------------------------------
+# Compact Columnar Task Storage
+# -------------------------------
+class BitSet:
+    __slots__ = ("bits",)
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def get(self, index):
+        return (self.bits[index >> 3] >> (index & 7)) & 1
+
+    def set(self, index, value):
+        byte = index >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        if value:
+            self.bits[byte] |= 1 << (index & 7)
+        else:
+            self.bits[byte] &= ~(1 << (index & 7)) & 0xFF
+
+    def copy(self):
+        other = BitSet()
+        other.bits = bytearray(self.bits)
+        return other
+
+class TaskView:
+    """Read-only view of one task in a ColumnarTaskList, with the TaskNode attributes."""
+
+    __slots__ = ("store", "id")
+
+    def __init__(self, store, task_id):
+        self.store = store
+        self.id = task_id
+
+    @property
+    def description(self):
+        return self.store.descriptions[self.id - 1]
+
+    @property
+    def folded_description(self):
+        return self.store.folded[self.id - 1]
+
+    @property
+    def priority(self):
+        return PRIORITY_NAMES[self.store.priorities[self.id - 1]]
+
+    @property
+    def date(self):
+        return self.store.date_text(self.id - 1)
+
+    @property
+    def due(self):
+        return self.store.dates[self.id - 1]
+
+    @property
+    def completed(self):
+        return bool(self.store.completed.get(self.id - 1))
+
+class ColumnarTaskList:
+    """TaskList that keeps one array per field instead of one object per task.
+
+    A task's id is its slot number plus one. Deleted slots are only marked
+    dead, so ids stay stable and list order is slot order. Priorities are
+    stored as PRIORITY_ORDER ranks, dates as ordinals, completion and
+    liveness as bitsets and descriptions as interned strings. get_node()
+    and iter_nodes() hand out TaskView objects instead of copies.
+    """
+
+    page_size = None
+
+    def __init__(self, use_trigram_index=False, use_fuzzy_index=False):
+        self.descriptions = []          # Interned description per slot (None once deleted)
+        self.folded = []                # fold_text(description) per slot
+        self.priorities = array("b")    # PRIORITY_ORDER rank per slot
+        self.dates = array("l")         # Date ordinal per slot, 0 if not a YYYY-MM-DD date
+        self.odd_dates = {}             # Slot -> date text that has no ordinal
+        self.completed = BitSet()
+        self.alive = BitSet()
+        self.date_index = SortedIndex("date")  # (due key, id) pairs for date sorting and ranges
+        self.count = 0
+        self.counts = TaskCounts()
+        self.reminders = ReminderQueue()
+        self.listeners = []  # Callbacks notified as listener(event, task_ids)
+        self.trigram_index = TrigramIndex() if use_trigram_index else None
+        self.fuzzy_index = FuzzyIndex() if use_fuzzy_index and numpy is not None else None
+
+    def __len__(self):
+        return self.count
+
+    def count_slot(self, slot, delta):
+        # Every change calls this with -1 before it and 1 after it
+        completed = self.completed.get(slot)
+        self.counts.add(PRIORITY_NAMES[self.priorities[slot]], completed, delta)
+        if delta < 0:
+            self.reminders.remove(slot + 1)
+        elif not completed:
+            self.reminders.add(slot + 1, self.dates[slot])
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, event, task_ids):
+        if task_ids:
+            for listener in self.listeners:
+                listener(event, task_ids)
+
+    def is_alive(self, task_id):
+        return 0 < task_id <= len(self.descriptions) and self.alive.get(task_id - 1)
+
+    def date_text(self, slot):
+        ordinal = self.dates[slot]
+        if ordinal:
+            return Date.fromordinal(ordinal).isoformat()
+        return self.odd_dates.get(slot, "")
+
+    def set_fields(self, slot, description, priority, date):
+        if priority not in PRIORITY_ORDER:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        description = sys.intern(description)
+        folded = sys.intern(fold_text(description))
+        ordinal = date_to_ordinal(date) or 0
+        if slot < len(self.descriptions):
+            self.date_index.entries.remove((self.dates[slot] or UNDATED, slot + 1))
+        self.date_index.entries.add((ordinal or UNDATED, slot + 1))
+        if slot == len(self.descriptions):
+            self.descriptions.append(description)
+            self.folded.append(folded)
+            self.priorities.append(PRIORITY_ORDER[priority])
+            self.dates.append(ordinal)
+        else:
+            self.descriptions[slot] = description
+            self.folded[slot] = folded
+            self.priorities[slot] = PRIORITY_ORDER[priority]
+            self.dates[slot] = ordinal
+        if ordinal:
+            self.odd_dates.pop(slot, None)
+        else:
+            self.odd_dates[slot] = date
+
+    def add_task(self, description, priority, date):
+        task_id = self.append_task(description, priority, date)
+        self.notify("added", [task_id])
+        return task_id
+
+    def add_many(self, tasks):
+        task_ids = []
+        try:
+            for task in tasks:
+                task_ids.append(self.append_task(*task))
+        finally:
+            self.notify("added", task_ids)
+        return task_ids
+
+    def append_task(self, description, priority, date, completed=False, task_id=None):
+        # task_id keeps a saved id; the slots of the ids skipped stay empty
+        slot = len(self.descriptions)
+        if task_id is not None:
+            if task_id <= slot:
+                raise ValueError(f"Task id {task_id} is already used")
+            skipped = task_id - 1 - slot
+            self.descriptions.extend([None] * skipped)
+            self.folded.extend([None] * skipped)
+            self.priorities.extend([0] * skipped)
+            self.dates.extend([0] * skipped)
+            slot = task_id - 1
+        self.set_fields(slot, description, priority, date)
+        self.alive.set(slot, True)
+        self.completed.set(slot, bool(completed))
+        self.count += 1
+        self.count_slot(slot, 1)
+        task_id = slot + 1
+        if self.trigram_index is not None:
+            self.trigram_index.add(task_id, self.folded[slot])
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(task_id, self.folded[slot])
+        return task_id
+
+    def unlink(self, task_id):
+        if not self.is_alive(task_id):
+            return False
+        slot = task_id - 1
+        if self.trigram_index is not None:
+            self.trigram_index.remove(task_id, self.folded[slot])
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.remove(task_id)
+        self.date_index.entries.remove((self.dates[slot] or UNDATED, task_id))
+        self.count_slot(slot, -1)
+        self.alive.set(slot, False)
+        self.completed.set(slot, False)
+        self.descriptions[slot] = self.folded[slot] = None
+        self.odd_dates.pop(slot, None)
+        self.count -= 1
+        return True
+
+    def delete_task(self, task_id):
+        if self.unlink(task_id):
+            self.notify("removed", [task_id])
+
+    def toggle_task_status(self, task_id):
+        self.toggle_many([task_id])
+
+    def edit_task(self, task_id, new_description, new_priority, new_date):
+        if not self.is_alive(task_id):
+            return
+        if new_priority not in PRIORITY_ORDER:
+            # Checked before the counts and reminders let go of the task
+            raise ValueError(f"Unknown priority: {new_priority!r}")
+        slot = task_id - 1
+        old_folded = self.folded[slot]
+        self.count_slot(slot, -1)
+        self.set_fields(slot, new_description, new_priority, new_date)
+        self.count_slot(slot, 1)
+        if self.trigram_index is not None and self.folded[slot] != old_folded:
+            self.trigram_index.remove(task_id, old_folded)
+            self.trigram_index.add(task_id, self.folded[slot])
+        if self.fuzzy_index is not None and self.folded[slot] != old_folded:
+            self.fuzzy_index.remove(task_id)
+            self.fuzzy_index.add(task_id, self.folded[slot])
+        self.notify("changed", [task_id])
+
+    def delete_many(self, task_ids):
+        removed = [task_id for task_id in set(task_ids) if self.unlink(task_id)]
+        self.notify("removed", removed)
+
+    def toggle_many(self, task_ids):
+        changed = [task_id for task_id in set(task_ids) if self.is_alive(task_id)]
+        for task_id in changed:
+            self.count_slot(task_id - 1, -1)
+            self.completed.set(task_id - 1, not self.completed.get(task_id - 1))
+            self.count_slot(task_id - 1, 1)
+        self.notify("changed", changed)
+
+    def set_completed_many(self, task_ids, value):
+        changed = [task_id for task_id in set(task_ids)
+                   if self.is_alive(task_id) and self.completed.get(task_id - 1) != value]
+        for task_id in changed:
+            self.count_slot(task_id - 1, -1)
+            self.completed.set(task_id - 1, value)
+            self.count_slot(task_id - 1, 1)
+        self.notify("changed", changed)
+
+    def next_due(self):
+        return self.reminders.next_due()
+
+    def pop_due(self, day):
+        return self.reminders.pop_due(day)
+
+    def get_node(self, task_id):
+        return TaskView(self, task_id) if self.is_alive(task_id) else None
+
+    def get_task(self, task_id):
+        node = self.get_node(task_id)
+        if node is None:
+            return None
+        return (node.description, node.priority, node.date, node.completed, node.id)
+
+    def get_all_tasks(self):
+        return [(node.description, node.priority, node.date, node.completed, node.id) for node in self.iter_nodes()]
+
+    def live_slots(self, start=0):
+        alive = self.alive.get
+        return (slot for slot in range(start, len(self.descriptions)) if alive(slot))
+
+    def search(self, query):
+        if self.trigram_index is not None:
+            candidates = self.trigram_index.candidates(query)
+            if candidates is not None:
+                folded = self.folded
+                return sorted(task_id for task_id in candidates if query in folded[task_id - 1])
+        folded = self.folded
+        return [slot + 1 for slot in self.live_slots() if query in folded[slot]]
+
+    def plan(self, query):
+        # Priority and status are cheap column compares, so only text and the
+        # date index can narrow the rows before the columns are filtered
+        if isinstance(query.sort, FuzzyRank):
+            return QueryPlan("fuzzy" if self.fuzzy_index is not None else "fuzzy_scan", self.count, True)
+        options = []
+        if query.search:
+            estimate = self.trigram_index.estimate(query.search) if self.trigram_index is not None else None
+            options.append((self.count, "text_scan") if estimate is None else (estimate, "text"))
+        if query.due is not None:
+            options.append((self.date_index.entries.count((query.due[0],), (query.due[1],)), "date"))
+        if not options and query.sort == "date":
+            options.append((self.count, "date"))  # Read the date index for its order
+        estimate, access = min(options, key=lambda option: option[0], default=(self.count, "scan"))
+        in_order = query.sort == "date" if access == "date" else query.sort is None
+        return QueryPlan(access, estimate, in_order)
+
+    def query_page(self, query, after=None, limit=None):
+        # Same contract as TaskList.query_page, evaluated on the columns
+        # without creating a node per task
+        if isinstance(query.sort, FuzzyRank):
+            return fuzzy_page(query, after, limit, self.fuzzy_index, self.get_node, self.iter_nodes())
+        plan = self.plan(query)
+        # Whether slots start right after the previous page: the date index
+        # for date order, and the slots themselves (id order) for list order
+        seeks = (plan.access == "scan" and query.sort is None) or (plan.access == "date" and query.sort == "date")
+        if plan.access in ("text", "text_scan"):
+            slots = [task_id - 1 for task_id in self.search(query.search)]
+        elif plan.access == "date":
+            task_ids = self.date_index.range_ids(query.due, after if query.sort == "date" else None)
+            slots = (task_id - 1 for task_id in task_ids)
+            if query.sort != "date":
+                slots = sorted(slots)
+        else:
+            slots = self.live_slots(after[0] if after is not None and seeks else 0)
+        folded = self.folded
+        if query.search and plan.access not in ("text", "text_scan"):
+            slots = [slot for slot in slots if query.search in folded[slot]]
+        for term in query.terms:
+            slots = [slot for slot in slots if term in folded[slot]]
+        if query.due is not None and plan.access != "date":
+            dates = self.dates
+            first, end = query.due
+            slots = [slot for slot in slots if first <= dates[slot] < end]
+        if query.priority is not None:
+            rank = PRIORITY_ORDER.get(query.priority)
+            priorities = self.priorities
+            slots = [slot for slot in slots if priorities[slot] == rank]
+        if query.status is not None:
+            completed = self.completed.get
+            status = int(query.status)
+            slots = [slot for slot in slots if completed(slot) == status]
+        if after is not None and not seeks:
+            # Drop the earlier pages before ordering, so each page orders only what is left
+            key = self.slot_key(query.sort)
+            slots = [slot for slot in slots if key(slot) > after]
+        if query.sort == "priority":
+            # Slots are already in id order, so bucketing by rank is a stable sort
+            priorities = self.priorities
+            buckets = {}
+            for slot in slots:
+                buckets.setdefault(priorities[slot], []).append(slot)
+            slots = [slot for rank in sorted(buckets) for slot in buckets[rank]]
+        elif query.sort == "priority_date" or query.sort == "date" and plan.access != "date":
+            # A short page needs only its smallest keys, not the whole order
+            key = self.slot_key(query.sort)
+            slots = list(slots)
+            if limit is not None and limit * 16 < len(slots):
+                slots = nsmallest(limit, slots, key=key)
+            else:
+                slots = sorted(slots, key=key)
+        elif query.sort == "completed":
+            # Stable partition of id-ordered slots
+            completed = self.completed.get
+            slots = list(slots)
+            slots = [slot for slot in slots if not completed(slot)] + [slot for slot in slots if completed(slot)]
+        return [slot + 1 for slot in islice(slots, limit)]
+
+    def slot_key(self, sort):
+        # sort_key of the task in a slot, read straight from the columns
+        priorities, dates, completed = self.priorities, self.dates, self.completed.get
+        if sort == "priority":
+            return lambda slot: (priorities[slot], slot + 1)
+        if sort == "date":
+            return lambda slot: (dates[slot] or UNDATED, slot + 1)
+        if sort == "priority_date":
+            return lambda slot: (priorities[slot], dates[slot] or UNDATED, slot + 1)
+        if sort == "completed":
+            return lambda slot: (completed(slot), slot + 1)
+        return lambda slot: (slot + 1,)
+
+    def explain(self, query):
+        return explain_plan(type(self).__name__, len(self), self.plan(query), query)
+
+    def iter_nodes(self):
+        for slot in self.live_slots():
+            yield TaskView(self, slot + 1)
+
+    def snapshot(self, indexes=True):
+        # A detached copy of the columns for querying from a worker thread;
+        # every copy is a flat C-level copy, cheap next to the query itself.
+        # Without indexes it only serves get_node and iter_nodes, as when saving
+        other = ColumnarTaskList()
+        other.descriptions = list(self.descriptions)
+        other.folded = list(self.folded)
+        other.priorities = self.priorities[:]
+        other.dates = self.dates[:]
+        other.odd_dates = dict(self.odd_dates)
+        other.completed = self.completed.copy()
+        other.alive = self.alive.copy()
+        other.count = self.count
+        other.counts = self.counts.copy()
+        if indexes:
+            other.date_index = self.date_index.copy()
+            other.trigram_index = self.trigram_index.copy() if self.trigram_index is not None else None
+            other.fuzzy_index = self.fuzzy_index.copy() if self.fuzzy_index is not None else None
+        return other
+
+    def close(self):
+        pass
+
+# -------------------------------
+# Persistent SQLite Task Storage
+# -------------------------------
+def keyset_condition(columns, after):
+    # SQL for "(columns) > after" in lexicographic order
+    if len(columns) == 1:
+        return f"{columns[0]} > ?", [after[0]]
+    rest, rest_params = keyset_condition(columns[1:], after[1:])
+    return f"({columns[0]} > ? OR ({columns[0]} = ? AND {rest}))", [after[0], after[0]] + rest_params
+
+class SQLiteTaskList:
+    """TaskList backed by a SQLite file; rows are loaded a page at a time."""
+
+    page_size = 500
+    cache_size = 20000  # Most TaskNodes kept in memory before the cache is dropped
+    # Columns matching sort_key() for each sort order
+    sort_columns = {
+        None: ["id"],
+        "priority": ["priority_rank", "id"],
+        "date": ["due", "id"],
+        "priority_date": ["priority_rank", "due", "id"],
+        "completed": ["completed", "id"],
+    }
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " description TEXT NOT NULL,"
+                " folded TEXT NOT NULL,"
+                " priority TEXT NOT NULL,"
+                " priority_rank INTEGER NOT NULL,"
+                " date TEXT NOT NULL,"
+                f" due INTEGER NOT NULL DEFAULT {UNDATED},"
+                " completed INTEGER NOT NULL DEFAULT 0)")
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(tasks)")}
+            if "due" not in columns:
+                # Files created before dates were parsed: add and fill the due column
+                self.connection.execute(f"ALTER TABLE tasks ADD COLUMN due INTEGER NOT NULL DEFAULT {UNDATED}")
+                self.connection.executemany("UPDATE tasks SET due = ? WHERE id = ?", [
+                    (date_to_ordinal(date) or UNDATED, task_id)
+                    for task_id, date in self.connection.execute("SELECT id, date FROM tasks").fetchall()])
+            self.connection.execute("DROP INDEX IF EXISTS tasks_date")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority_rank, id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due, id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_priority_due ON tasks (priority_rank, due, id)")
+            # Only the open tasks, for reminders; next_due() reads its first entry
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_open_due ON tasks (due, id) WHERE completed = 0")
+        self.count = self.connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        # Counted once when the file is opened, then kept up to date by every change
+        self.counts = TaskCounts()
+        for priority, completed, count in self.connection.execute(
+                "SELECT priority, completed, COUNT(*) FROM tasks GROUP BY priority, completed"):
+            self.counts.add(priority, completed, count)
+        self.cache = {}      # Task id -> TaskNode for recently loaded rows
+        self.listeners = []  # Callbacks notified as listener(event, task_ids)
+        self.fuzzy_text = ""
+        self.connection.create_function("fuzzy_rank", 1, self.fuzzy_rank)
+        self.reminded_through = 0  # As in ReminderQueue; tasks_open_due stands in for its heap
+
+    def __len__(self):
+        return self.count
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, event, task_ids):
+        if task_ids:
+            for listener in self.listeners:
+                listener(event, task_ids)
+
+    def node_from_row(self, row):
+        node = TaskNode(row[0], row[1], row[2], row[3])
+        node.completed = bool(row[4])
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[node.id] = node
+        return node
+
+    def fuzzy_rank(self, folded):
+        # SQL function behind fuzzy searches; query_sql sets fuzzy_text
+        return -fuzzy_score(self.fuzzy_text, folded)
+
+    def status_of(self, task_id):
+        # (priority, completed) of a task as stored, or None
+        return self.connection.execute("SELECT priority, completed FROM tasks WHERE id = ?", (task_id,)).fetchone()
+
+    def add_task(self, description, priority, date):
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO tasks (description, folded, priority, priority_rank, date, due) VALUES (?, ?, ?, ?, ?, ?)",
+                (description, fold_text(description), priority, PRIORITY_ORDER.get(priority, 99), date,
+                 date_to_ordinal(date) or UNDATED))
+        self.count += 1
+        self.counts.add(priority, False)
+        self.notify("added", [cursor.lastrowid])
+        return cursor.lastrowid
+
+    def add_many(self, tasks):
+        # Commits every IMPORT_BATCH_SIZE rows, so tasks can be a generator
+        # over a file far larger than memory
+        task_ids = []
+        tasks = iter(tasks)
+        try:
+            while True:
+                batch = list(islice(tasks, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                batch_ids = []
+                with self.connection:
+                    for description, priority, date, completed in batch:
+                        cursor = self.connection.execute(
+                            "INSERT INTO tasks (description, folded, priority, priority_rank, date, due, completed) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (description, fold_text(description), priority, PRIORITY_ORDER.get(priority, 99), date,
+                             date_to_ordinal(date) or UNDATED, int(bool(completed))))
+                        batch_ids.append(cursor.lastrowid)
+                for description, priority, date, completed in batch:
+                    self.counts.add(priority, bool(completed))
+                self.count += len(batch)
+                task_ids += batch_ids
+        finally:
+            self.notify("added", task_ids)
+        return task_ids
+
+    def delete_task(self, task_id):
+        self.delete_many([task_id])
+
+    def toggle_task_status(self, task_id):
+        self.toggle_many([task_id])
+
+    def edit_task(self, task_id, new_description, new_priority, new_date):
+        with self.connection:
+            old = self.status_of(task_id)
+            if old is not None:
+                self.connection.execute(
+                    "UPDATE tasks SET description = ?, folded = ?, priority = ?, priority_rank = ?, date = ?, due = ? WHERE id = ?",
+                    (new_description, fold_text(new_description), new_priority,
+                     PRIORITY_ORDER.get(new_priority, 99), new_date, date_to_ordinal(new_date) or UNDATED, task_id))
+        self.cache.pop(task_id, None)
+        if old is not None:
+            self.counts.add(old[0], old[1], -1)
+            self.counts.add(new_priority, old[1])
+            self.notify("changed", [task_id])
+
+    def delete_many(self, task_ids):
+        removed = []
+        with self.connection:
+            for task_id in set(task_ids):
+                old = self.status_of(task_id)
+                if old is not None:
+                    self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                    self.counts.add(old[0], old[1], -1)
+                    removed.append(task_id)
+                self.cache.pop(task_id, None)
+        self.count -= len(removed)
+        self.notify("removed", removed)
+
+    def toggle_many(self, task_ids):
+        changed = []
+        with self.connection:
+            for task_id in set(task_ids):
+                old = self.status_of(task_id)
+                if old is not None:
+                    self.connection.execute("UPDATE tasks SET completed = 1 - completed WHERE id = ?", (task_id,))
+                    self.counts.add(old[0], old[1], -1)
+                    self.counts.add(old[0], not old[1])
+                    changed.append(task_id)
+                self.cache.pop(task_id, None)
+        self.notify("changed", changed)
+
+    def set_completed_many(self, task_ids, value):
+        changed = []
+        with self.connection:
+            for task_id in set(task_ids):
+                old = self.status_of(task_id)
+                if old is not None and bool(old[1]) != value:
+                    self.connection.execute("UPDATE tasks SET completed = ? WHERE id = ?", (int(value), task_id))
+                    self.counts.add(old[0], old[1], -1)
+                    self.counts.add(old[0], value)
+                    changed.append(task_id)
+                self.cache.pop(task_id, None)
+        self.notify("changed", changed)
+
+    def next_due(self):
+        return self.connection.execute(
+            "SELECT MIN(due) FROM tasks INDEXED BY tasks_open_due"
+            f" WHERE due > ? AND due < {UNDATED} AND completed = 0",
+            (self.reminded_through,)).fetchone()[0]
+
+    def pop_due(self, day):
+        task_ids = [row[0] for row in self.connection.execute(
+            "SELECT id FROM tasks INDEXED BY tasks_open_due WHERE due > ? AND due <= ? AND completed = 0 ORDER BY due, id",
+            (self.reminded_through, min(day, UNDATED - 1)))]
+        self.reminded_through = max(self.reminded_through, day)
+        return task_ids
+
+    def get_node(self, task_id):
+        node = self.cache.get(task_id)
+        if node is None:
+            row = self.connection.execute(
+                "SELECT id, description, priority, date, completed FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is not None:
+                node = self.node_from_row(row)
+        return node
+
+    def get_task(self, task_id):
+        node = self.get_node(task_id)
+        if node is None:
+            return None
+        return (node.description, node.priority, node.date, node.completed, node.id)
+
+    def get_all_tasks(self):
+        return [(row[1], row[2], row[3], bool(row[4]), row[0]) for row in self.connection.execute(
+            "SELECT id, description, priority, date, completed FROM tasks ORDER BY id")]
+
+    def search(self, query):
+        return [row[0] for row in self.connection.execute(
+            "SELECT id FROM tasks WHERE instr(folded, ?) > 0 ORDER BY id", (query,))]
+
+    def query_sql(self, query, after=None, limit=None):
+        # Filters and sort run in SQL; paging is keyset-based so it stays
+        # correct while rows are added or removed between pages
+        where, params = [], []
+        for text in ([query.search] if query.search else []) + list(query.terms):
+            where.append("instr(folded, ?) > 0")
+            params.append(text)
+        if query.priority is not None:
+            where.append("priority_rank = ?")  # Matches the tasks_priority index
+            params.append(PRIORITY_ORDER.get(query.priority, 99))
+        if query.status is not None:
+            where.append("completed = ?")
+            params.append(int(query.status))
+        if query.due is not None:
+            where.append("due >= ? AND due < ?")
+            params += list(query.due)
+        if isinstance(query.sort, FuzzyRank):
+            # Scored row by row through fuzzy_rank(); the rank is -score as in sort_key
+            self.fuzzy_text = query.sort.text
+            where.append("fuzzy_rank(folded) <= ?")
+            params.append(-FUZZY_MIN_SCORE)
+            columns = ["fuzzy_rank(folded)", "id"]
+        else:
+            columns = self.sort_columns[query.sort]
+        if after is not None:
+            condition, condition_params = keyset_condition(columns, after)
+            where.append(condition)
+            params += condition_params
+        sql = "SELECT id, description, priority, date, completed FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(columns)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def query_page(self, query, after=None, limit=None):
+        sql, params = self.query_sql(query, after, limit)
+        return [self.node_from_row(row).id for row in self.connection.execute(sql, params)]
+
+    def explain(self, query):
+        # SQLite picks the index itself; report its plan for the first page
+        sql, params = self.query_sql(query, None, self.page_size)
+        lines = [f"{type(self).__name__}: {len(self)} tasks", sql]
+        lines += ["access: " + row[-1] for row in self.connection.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        return "\n".join(lines)
+
+    def iter_nodes(self):
+        for row in self.connection.execute("SELECT id, description, priority, date, completed FROM tasks ORDER BY id"):
+            yield self.node_from_row(row)
+
+    def close(self):
+        self.connection.close()
+
+# -------------------------------
+# Autosave for In-Memory Task Lists
+# -------------------------------
+DEFAULT_TASK_FILE = os.path.join(os.path.expanduser("~"), ".todo_tasks.jsonl")
+AUTOSAVE_COMPACT_BYTES = 1 << 20  # Journal size at which the whole file is rewritten
+
+# One save: "journal" or "file", tasks written, bytes written and seconds taken
+SaveStats = namedtuple("SaveStats", "kind records bytes seconds")
+
+def task_record(node):
+    return {"id": node.id, "description": node.description, "priority": node.priority,
+            "date": node.date, "completed": bool(node.completed)}
+
+def saved_record(line):
+    # The record on one saved line, or None if the line is damaged
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or type(record.get("id")) is not int or record["id"] < 1:
+        return None
+    if record.get("deleted"):
+        return record
+    if (not isinstance(record.get("description"), str) or record.get("priority") not in PRIORITY_ORDER
+            or not isinstance(record.get("date"), str)):
+        return None
+    return record
+
+def sync_directory(path):
+    # Make a rename inside the directory durable (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+class Autosaver:
+    """Saves a TaskList or ColumnarTaskList to a JSON Lines file in the background.
+
+    The file has a header line and one task per line. Tasks changed since
+    the last flush are appended to a numbered journal beside it, so a flush
+    writes only those. Once the journal is large, the whole file is written
+    from a snapshot to a temporary file, fsynced and renamed over the old
+    one, and a new journal is started. A crash leaves either the old file
+    with its journal or the new one; a journal line cut short is ignored.
+    Damaged lines are skipped and the file is first copied to backup; a
+    file that cannot be read at all is never written over.
+    Writes run in order on one background thread. After a failed write the
+    next flush rewrites the whole file, so no change is lost while error
+    is set.
+    """
+
+    def __init__(self, task_list, path):
+        self.task_list = task_list
+        self.path = path
+        self.journal = 0          # Number of the journal that goes with the file
+        self.journal_bytes = 0    # Bytes in that journal, updated by the writer
+        self.dirty = set()        # Ids of tasks changed since the last flush
+        self.history = deque(maxlen=100)  # SaveStats of recent writes
+        self.error = None         # OSError of a failed write, until the file is rewritten
+        self.rewrite = False      # Set by the writer when a write failed
+        self.damaged = 0          # Saved lines skipped by load() as damaged
+        self.backup = None        # Copy of the damaged file, kept beside it
+        self.read_error = None    # OSError that kept load() from reading the file
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        if self.load():
+            self.compact()
+        task_list.add_listener(self.on_tasks_changed)
+
+    def journal_path(self, number):
+        return f"{self.path}.{number}.journal"
+
+    def load(self):
+        # Fill the empty store from the file and its journal, keeping the saved
+        # ids. Returns True if the file should be rewritten: a line was damaged.
+        records, rewrite, header = {}, False, True
+        try:
+            with open(self.path, "rb") as file:
+                try:
+                    self.journal = int(json.loads(file.readline() or b"{}").get("journal", 0))
+                except (ValueError, TypeError, AttributeError):
+                    self.damaged += 1
+                    header = False  # Which journal goes with the file is unknown
+                for line in file:
+                    record = saved_record(line)
+                    if record is None:
+                        self.damaged += 1
+                    else:
+                        records[record["id"]] = record
+            with open(self.journal_path(self.journal) if header else os.devnull, "rb") as journal:
+                for line in journal:
+                    record = saved_record(line)
+                    if record is None:
+                        rewrite = True  # A write cut short by a crash
+                        break
+                    if record.get("deleted"):
+                        records.pop(record["id"], None)
+                    else:
+                        records[record["id"]] = record
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            self.read_error = error
+            return False
+        if self.damaged:
+            self.backup = self.path + ".damaged"
+            try:
+                shutil.copyfile(self.path, self.backup)
+            except OSError as error:
+                self.read_error = error
+                return False
+        self.task_list.add_many((record["description"], record["priority"], record["date"],
+                                 bool(record.get("completed")), task_id) for task_id, record in sorted(records.items()))
+        return rewrite or self.damaged > 0
+
+    def on_tasks_changed(self, event, task_ids):
+        self.dirty.update(task_ids)
+
+    def flush(self, wait=False):
+        # Runs on the caller's thread only long enough to copy the dirty tasks.
+        # Returns True if a write was queued.
+        # Rewriting the file is cheaper than journaling most of the list (after an import)
+        if self.read_error is not None:
+            return False
+        queued = True
+        if self.rewrite or self.journal_bytes >= AUTOSAVE_COMPACT_BYTES or len(self.dirty) * 2 > len(self.task_list):
+            self.compact()
+        elif self.dirty:
+            get_node = self.task_list.get_node
+            records = []
+            for task_id in sorted(self.dirty):
+                node = get_node(task_id)
+                records.append(task_record(node) if node is not None else {"id": task_id, "deleted": True})
+            self.dirty = set()
+            self.writer.submit(self.timed, self.append_journal, records, self.journal)
+        else:
+            queued = False
+        if wait:
+            self.writer.submit(int).result()  # Returns once every earlier write is done
+        return queued
+
+    def compact(self):
+        # A snapshot is cheap to take and safe to read from the writer thread
+        self.rewrite = False
+        self.dirty = set()
+        self.journal += 1
+        self.journal_bytes = 0
+        self.writer.submit(self.timed, self.write_file, self.task_list.snapshot(indexes=False), self.journal)
+
+    def timed(self, write, *args):
+        start = time.perf_counter()
+        try:
+            kind, records, size = write(*args)
+        except OSError as error:
+            # The failed changes are no longer in dirty; the next flush writes
+            # them all again from a snapshot
+            self.error = error
+            self.rewrite = True
+            return
+        if kind == "file":
+            self.error = None  # The file holds everything written before it
+        self.history.append(SaveStats(kind, records, size, time.perf_counter() - start))
+
+    def append_journal(self, records, number):
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        with open(self.journal_path(number), "ab") as journal:
+            journal.write(data)
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.journal_bytes += len(data)
+        return "journal", len(records), len(data)
+
+    def write_file(self, snapshot, number):
+        temporary = self.path + ".tmp"
+        records = size = 0
+        with open(temporary, "wb") as file:
+            for record in [{"journal": number}] + [task_record(node) for node in snapshot.iter_nodes()]:
+                data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                file.write(data)
+                size += len(data)
+                records += 1
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        sync_directory(self.path)
+        # The new file already holds everything from older journals
+        for old in range(number):
+            if os.path.exists(self.journal_path(old)):
+                os.remove(self.journal_path(old))
+        return "file", records - 1, size
+
+    def stats(self):
+        # Totals over the recent writes, for reporting
+        history = list(self.history)
+        return {
+            "writes": len(history),
+            "records": sum(stats.records for stats in history),
+            "bytes": sum(stats.bytes for stats in history),
+            "max_seconds": max((stats.seconds for stats in history), default=0.0),
+            "last": history[-1]._asdict() if history else None,
+            "error": str(self.error) if self.error else None,
+        }
+
+    def close(self):
+        self.flush(wait=True)
+        if self.rewrite:
+            self.flush(wait=True)  # One retry for a write that failed during the first
+        self.writer.shutdown()
+
+# -------------------------------
+# Search Box Query Language
+# -------------------------------
+# A query is a list of QueryTerms that must all hold: field is "text",
+# "fuzzy", "priority", "status" or "due", op is ":" or a comparison for due,
+# and value is the text, priority name, completion flag or date ordinal
+QueryTerm = namedtuple("QueryTerm", "field op value")
+QUERY_TOKEN = re.compile(r'(?<!\S)(priority|status|due)(<=|>=|<|>|:|=)(?:"([^"]*)"|(\S+))'
+                         r'|(?<!\S)~(?:"([^"]*)"|(\S+))|"([^"]*)"', re.IGNORECASE)
+# Priority and status words the search box accepts: every TASK_LABELS label,
+# so the CLI accepts the same words as the GUI, and a few English synonyms
+PRIORITY_WORDS = {fold_text(labels[name]): name for labels in TASK_LABELS.values() for name in PRIORITY_ORDER}
+STATUS_WORDS = {"open": False, "todo": False, "done": True, "closed": True}
+STATUS_WORDS.update({fold_text(labels[status]): status for labels in TASK_LABELS.values() for status in (True, False)})
+# Half-open ordinal range for each due comparison; valid dates start at ordinal 1
+DUE_RANGES = {
+    "<": lambda day: (1, day),
+    "<=": lambda day: (1, day + 1),
+    ">": lambda day: (day + 1, UNDATED),
+    ">=": lambda day: (day, UNDATED),
+    ":": lambda day: (day, day + 1),
+}
+
+def parse_query(text):
+    """Parse search box text such as priority:high status:open due<2025-03-01 "report".
+
+    Field terms may appear anywhere, with the value quoted when it has a
+    space (status:"غير مكتملة"); quoted phrases and the plain text between
+    terms become text terms, and a word or quoted phrase after ~
+    (~reprot, ~"weekly reprot") a fuzzy term. Raises ValueError for a field
+    term whose value is not understood.
+    """
+    terms = []
+
+    def add_text(piece):
+        piece = piece.strip()
+        if piece:
+            terms.append(QueryTerm("text", ":", piece))
+
+    position = 0
+    for match in QUERY_TOKEN.finditer(text):
+        add_text(text[position:match.start()])
+        position = match.end()
+        field, op, quoted_value, value, fuzzy_phrase, fuzzy_word, phrase = match.groups()
+        if phrase is not None:
+            add_text(phrase)
+            continue
+        if field is None:
+            fuzzy = (fuzzy_word if fuzzy_phrase is None else fuzzy_phrase).strip()
+            if fuzzy:
+                terms.append(QueryTerm("fuzzy", ":", fuzzy))
+            continue
+        if quoted_value is not None:
+            value = quoted_value.strip()
+        field, folded = field.casefold(), fold_text(value)
+        if field == "due":
+            day = Date.today().toordinal() if folded == "today" else date_to_ordinal(value)
+            if day is None:
+                raise ValueError(f"Not a YYYY-MM-DD date: {value!r}")
+            terms.append(QueryTerm("due", ":" if op == "=" else op, day))
+        elif op not in (":", "="):
+            raise ValueError(f"{field} cannot be compared with {op!r}")
+        elif field == "priority":
+            if folded not in PRIORITY_WORDS:
+                raise ValueError(f"Unknown priority: {value!r}")
+            terms.append(QueryTerm("priority", ":", PRIORITY_WORDS[folded]))
+        else:
+            if folded not in STATUS_WORDS:
+                raise ValueError(f"Unknown status: {value!r}")
+            terms.append(QueryTerm("status", ":", STATUS_WORDS[folded]))
+    add_text(text[position:])
+    return terms
+
+def compile_query(terms, base=TaskQuery("", None, None, None, None)):
+    """Fold parsed terms into base, usually the query chosen with the combos.
+
+    Conditions on the same field are intersected. Contradictory ones give an
+    empty due range, which no store matches. The longest text becomes the
+    search, the one a store can use an index for, and the rest become terms.
+    Fuzzy terms are joined into one FuzzyRank, which replaces the sort.
+    """
+    texts = ([base.search] if base.search else []) + list(base.terms)
+    priority, status, due = base.priority, base.status, base.due
+    fuzzy = []
+    conflict = False
+    for term in terms:
+        if term.field == "text":
+            texts.append(fold_text(term.value))
+        elif term.field == "fuzzy":
+            fuzzy.append(fold_text(term.value))
+        elif term.field == "priority":
+            conflict = conflict or (priority is not None and priority != term.value)
+            priority = term.value
+        elif term.field == "status":
+            conflict = conflict or (status is not None and status != term.value)
+            status = term.value
+        else:
+            first, end = DUE_RANGES[term.op](term.value)
+            if due is not None:
+                first, end = max(first, due[0]), min(end, due[1])
+            due = (first, end)
+    if conflict:
+        due = (0, 0)
+    # Text contained in another text adds nothing
+    texts = sorted({text for text in texts if not any(text != other and text in other for other in texts)},
+                   key=lambda text: (-len(text), text))
+    sort = FuzzyRank(" ".join(fuzzy)) if fuzzy else base.sort
+    return TaskQuery(texts[0] if texts else "", priority, status, due, sort, tuple(texts[1:]))
+
+# -------------------------------
+# Bulk Import and Export
+# -------------------------------
+IMPORT_BATCH_SIZE = 10000  # Rows per SQLite transaction in add_many
+TASK_COLUMNS = ("description", "priority", "date", "completed")
+TASK_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+COMPLETED_WORDS = {"1", "true", "yes", "y", "x", "done"}
+COMPLETED_WORDS.update(fold_text(labels[True]) for labels in TASK_LABELS.values())
+
+def task_format(path):
+    # "csv" or "jsonl" from the file name
+    try:
+        return TASK_FORMATS[os.path.splitext(path)[1].lower()]
+    except KeyError:
+        raise ValueError(f"{path}: expected a .csv, .jsonl or .ndjson file") from None
+
+def task_from_row(row):
+    # (description, priority, date, completed) from a CSV or JSON row; the
+    # priority may be written in any case or language the search box accepts
+    description = row.get("description")
+    if not description:
+        raise ValueError("missing description")
+    priority = PRIORITY_WORDS.get(fold_text(str(row.get("priority") or "Medium")))
+    if priority is None:
+        raise ValueError(f"unknown priority {row.get('priority')!r}")
+    completed = row.get("completed")
+    if not isinstance(completed, bool):
+        completed = fold_text(str(completed or "")) in COMPLETED_WORDS
+    return str(description), priority, str(row.get("date") or ""), completed
+
+def read_tasks(file, format):
+    """Yield task tuples for add_many from an open CSV or JSON Lines file.
+
+    Reads one row at a time, so memory stays flat however long the file is.
+    CSV files need a header naming the TASK_COLUMNS they use (in any order);
+    JSON Lines files may be ones the app autosaved. A bad row raises
+    ValueError with its line number.
+    """
+    if format == "csv":
+        rows = csv.DictReader(file)
+        for row in rows:
+            try:
+                yield task_from_row(row)
+            except ValueError as error:
+                raise ValueError(f"line {rows.line_num}: {error}") from None
+    else:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if number == 1 and "journal" in row:
+                    continue  # Header of a file written by Autosaver
+                yield task_from_row(row)
+            except (ValueError, AttributeError, TypeError) as error:
+                raise ValueError(f"line {number}: {error}") from None
+
+def write_tasks(file, nodes, format):
+    # Streams nodes (TaskNode or TaskView) to an open text file; returns the count
+    count = 0
+    if format == "csv":
+        writer = csv.writer(file)
+        writer.writerow(TASK_COLUMNS)
+        for node in nodes:
+            writer.writerow((node.description, node.priority, node.date, "true" if node.completed else "false"))
+            count += 1
+    else:
+        for node in nodes:
+            record = task_record(node)
+            del record["id"]
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+def query_nodes(task_list, query, limit=None):
+    # Matching nodes in query order, fetched a page at a time
+    after = None
+    while limit is None or limit > 0:
+        page_size = 1000 if limit is None else min(limit, 1000)
+        page = task_list.query_page(query, after, page_size)
+        for task_id in page:
+            yield task_list.get_node(task_id)
+        if len(page) < page_size:
+            return
+        if limit is not None:
+            limit -= len(page)
+        after = sort_key(query.sort, task_list.get_node(page[-1]))
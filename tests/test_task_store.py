@@ -0,0 +1,557 @@
+import os
+import sys
+import tempfile
+import unittest
+from bisect import bisect_left, insort
+from datetime import date as Date
+from random import Random
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_store
+from task_store import (FUZZY_MIN_SCORE, PRIORITY_ORDER, SORT_ORDERS, TASK_LABELS, Autosaver, ColumnarTaskList,
+                        FuzzyIndex, FuzzyRank, QueryTerm, SortedKeyList, SQLiteTaskList, TaskList, TaskQuery,
+                        compile_query, date_to_ordinal, fold_text, fuzzy_score, parse_query, sort_key, task_matches)
+
+
+def saved_tasks(task_list):
+    return [(node.id, node.description, node.priority, node.date, node.completed)
+            for node in task_list.iter_nodes()]
+
+
+class AutosaverTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def reload(self, store=TaskList):
+        task_list = store()
+        autosave = Autosaver(task_list, self.path)
+        autosave.close()
+        return task_list, autosave
+
+    def test_round_trip_with_cut_short_journal_keeps_ids(self):
+        for store in (TaskList, ColumnarTaskList):
+            with self.subTest(store=store.__name__):
+                self.path = os.path.join(self.directory.name, store.__name__ + ".jsonl")
+                task_list = store()
+                autosave = Autosaver(task_list, self.path)
+                for number in range(1, 11):
+                    task_list.add_task(f"task {number}", "High" if number % 2 else "Low", f"2025-03-{number:02d}")
+                autosave.flush(wait=True)  # Most of the list changed: the whole file is written
+                task_list.delete_task(2)
+                task_list.delete_task(5)
+                task_list.toggle_task_status(7)
+                autosave.close()
+                journal = autosave.journal_path(autosave.journal)
+                self.assertTrue(os.path.exists(journal))
+                with open(journal, "ab") as file:
+                    file.write(b'{"id": 9, "description": "cut sh')  # A crash in the middle of a write
+
+                loaded, reloaded = self.reload(store)
+                self.assertEqual(saved_tasks(loaded), saved_tasks(task_list))
+                # The damaged journal is written away
+                self.assertEqual(reloaded.journal, autosave.journal + 1)
+                self.assertFalse(os.path.exists(journal))
+                self.assertEqual(reloaded.history[-1].kind, "file")
+
+                # The ids kept their gaps, so loading again rewrites nothing
+                loaded, reloaded = self.reload(store)
+                self.assertEqual(saved_tasks(loaded), saved_tasks(task_list))
+                self.assertEqual(list(reloaded.history), [])
+                loaded = store()
+                reloaded = Autosaver(loaded, self.path)
+                loaded.edit_task(3, "edited", "Medium", "2025-04-01")
+                loaded.add_task("new", "Low", "")
+                reloaded.close()
+                self.assertEqual([stats.kind for stats in reloaded.history], ["journal"])
+                self.assertEqual(saved_tasks(self.reload(store)[0]), saved_tasks(loaded))
+                self.assertEqual(loaded.get_node(11).description, "new")
+
+    def test_damaged_lines_are_skipped_and_the_file_kept(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('{"journal": 0}\n')
+            file.write('{"id": 1, "description": "kept", "priority": "High", "date": "", "completed": false}\n')
+            file.write("not json\n")
+            file.write('{"description": "no id", "priority": "Low", "date": "", "completed": false}\n')
+            file.write('{"id": 4, "description": "bad priority", "priority": "Urgent", "date": "", "completed": false}\n')
+            file.write('{"id": 5, "description": "also kept", "priority": "Low", "date": "", "completed": true}\n')
+        with open(self.path, "rb") as file:
+            original = file.read()
+        task_list, autosave = self.reload()
+        self.assertEqual(autosave.damaged, 3)
+        self.assertIsNone(autosave.read_error)
+        self.assertEqual([(node.id, node.description) for node in task_list.iter_nodes()], [(1, "kept"), (5, "also kept")])
+        with open(autosave.backup, "rb") as file:
+            self.assertEqual(file.read(), original)
+        self.assertEqual(self.reload()[1].damaged, 0)
+
+    def test_unreadable_file_is_not_written_over(self):
+        os.mkdir(self.path)
+        task_list = TaskList()
+        autosave = Autosaver(task_list, self.path)
+        self.assertIsInstance(autosave.read_error, OSError)
+        task_list.add_task("unsaved", "Low", "")
+        self.assertFalse(autosave.flush(wait=True))
+        autosave.close()
+        self.assertTrue(os.path.isdir(self.path))
+        self.assertEqual(list(autosave.history), [])
+
+    def test_failed_write_is_retried_from_a_snapshot(self):
+        task_list = TaskList()
+        autosave = Autosaver(task_list, self.path)
+        for number in range(10):
+            task_list.add_task(f"task {number}", "Medium", "2025-03-01")
+        autosave.flush(wait=True)
+        append_journal = autosave.append_journal
+
+        def fail(records, number):
+            autosave.append_journal = append_journal
+            raise OSError(28, "No space left on device")
+
+        autosave.append_journal = fail
+        task_list.delete_task(3)
+        autosave.flush(wait=True)
+        self.assertIsNotNone(autosave.error)
+        self.assertFalse(autosave.dirty)
+        autosave.close()  # Rewrites the file although nothing changed since
+        self.assertIsNone(autosave.error)
+        self.assertEqual([node.description for node in self.reload()[0].iter_nodes()],
+                         [node.description for node in task_list.iter_nodes()])
+
+
+class SortedKeyListTest(unittest.TestCase):
+    # A load of 2 splits sublists after a handful of adds, so every path runs
+    def setUp(self):
+        patcher = mock.patch.object(SortedKeyList, "load", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertSame(self, keys, expected):
+        self.assertEqual(list(keys), expected)
+        self.assertEqual(len(keys), len(expected))
+        self.assertEqual(keys.maxes, [sublist[-1] for sublist in keys.lists])
+        self.assertTrue(all(0 < len(sublist) <= 2 * SortedKeyList.load for sublist in keys.lists))
+        self.assertEqual(len(keys.owned), len(keys.lists))
+
+    def check_reads(self, random, keys, expected):
+        for _ in range(10):
+            low, high = random.randint(-2, 42), random.randint(-2, 42)
+            self.assertEqual(list(keys.irange(low, high)), [value for value in expected if low <= value < high])
+            self.assertEqual(list(keys.irange(low, low_exclusive=True)), [value for value in expected if value > low])
+            self.assertEqual(list(keys.irange(high=high)), [value for value in expected if value < high])
+            self.assertEqual(keys.position(low), bisect_left(expected, low))
+            self.assertEqual(keys.count(low, high), max(bisect_left(expected, high) - bisect_left(expected, low), 0))
+
+    def test_matches_a_sorted_list(self):
+        random = Random(9)
+        for _ in range(20):
+            keys, expected = SortedKeyList(), []
+            for _ in range(random.randint(0, 120)):
+                value = random.randint(0, 40)
+                if random.random() < 0.6:
+                    keys.add(value)
+                    insort(expected, value)
+                else:
+                    keys.remove(value)  # Often not there, which must be a no-op
+                    if value in expected:
+                        expected.remove(value)
+                self.assertSame(keys, expected)
+            self.check_reads(random, keys, expected)
+
+    def test_removing_the_last_value_of_a_sublist_moves_its_max(self):
+        keys = SortedKeyList()
+        for value in range(10):
+            keys.add(value)
+        for value in (4, 3, 9, 0):
+            keys.remove(value)
+        self.assertSame(keys, [1, 2, 5, 6, 7, 8])
+        self.assertEqual(list(keys.irange(3, low_exclusive=True)), [5, 6, 7, 8])
+        self.assertEqual(list(keys.irange(2, low_exclusive=True)), [5, 6, 7, 8])
+        self.assertEqual(keys.count(2, 8), 4)
+
+    def test_copies_change_independently(self):
+        random = Random(10)
+        keys, expected = SortedKeyList(), []
+        for _ in range(60):
+            value = random.randint(0, 40)
+            keys.add(value)
+            insort(expected, value)
+        copies = [(keys, expected)]
+        for _ in range(200):
+            if random.random() < 0.05:
+                keys, expected = random.choice(copies)
+                copies.append((keys.copy(), list(expected)))
+            keys, expected = random.choice(copies)
+            value = random.randint(0, 40)
+            if random.random() < 0.5:
+                keys.add(value)
+                insort(expected, value)
+            elif value in expected:
+                keys.remove(value)
+                expected.remove(value)
+        for keys, expected in copies:
+            self.assertSame(keys, expected)
+            self.check_reads(random, keys, expected)
+
+
+@unittest.skipIf(task_store.numpy is None, "FuzzyIndex needs NumPy")
+class FuzzyIndexTest(unittest.TestCase):
+    words = ["report", "reprot", "weekly", "call", "calll", "تقرير", "تقارير", "buy", "milk", "email", "emial"]
+    texts = ["reprot", "weekly report", "call", "تقرر", "buy mlk", "emial 1", "zzz"]
+
+    def setUp(self):
+        # Small enough that dead runs are compacted and ranking is chunked and threaded
+        patcher = mock.patch.multiple(task_store, FUZZY_COMPACT_MIN=4, FUZZY_CHUNK_SLOTS=3, FUZZY_PARALLEL_MIN=8,
+                                      FUZZY_THREADS=3, fuzzy_pool=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: task_store.fuzzy_pool and task_store.fuzzy_pool.shutdown())
+        compact = mock.patch.object(FuzzyIndex, "compact", autospec=True, side_effect=FuzzyIndex.compact)
+        self.compact = compact.start()
+        self.addCleanup(compact.stop)
+
+    def description(self, random):
+        return fold_text(" ".join(random.choice(self.words) for _ in range(random.randint(1, 3)))
+                         + f" {random.randint(0, 9)}")
+
+    @staticmethod
+    def brute_force(descriptions, text, after=None):
+        keys = sorted((-fuzzy_score(text, folded), task_id) for task_id, folded in descriptions.items()
+                      if fuzzy_score(text, folded) >= FUZZY_MIN_SCORE)
+        return [task_id for rank, task_id in keys if after is None or (rank, task_id) > after]
+
+    def mutate(self, random, index, descriptions, next_id):
+        operation = random.random()
+        if operation < 0.45 or not descriptions:
+            descriptions[next_id] = self.description(random)
+            index.add(next_id, descriptions[next_id])
+            return next_id + 1
+        task_id = random.choice(list(descriptions))
+        index.remove(task_id)
+        if operation < 0.75:
+            del descriptions[task_id]
+        else:  # An edit
+            descriptions[task_id] = self.description(random)
+            index.add(task_id, descriptions[task_id])
+        if random.random() < 0.2:
+            index.flush()
+        return next_id
+
+    def assertRanks(self, index, descriptions):
+        for text in self.texts:
+            expected = self.brute_force(descriptions, text)
+            self.assertEqual(index.rank(text, FUZZY_MIN_SCORE).tolist(), expected, text)
+            for position in range(0, len(expected), 3):
+                task_id = expected[position]
+                after = (-fuzzy_score(text, descriptions[task_id]), task_id)
+                self.assertEqual(index.rank(text, FUZZY_MIN_SCORE, after).tolist(), expected[position + 1:])
+
+    def test_rank_matches_fuzzy_score(self):
+        random = Random(21)
+        index, descriptions, next_id = FuzzyIndex(), {}, 1
+        for step in range(400):
+            next_id = self.mutate(random, index, descriptions, next_id)
+            if step % 25 == 0:
+                self.assertRanks(index, descriptions)
+        self.assertRanks(index, descriptions)
+        self.assertTrue(self.compact.called)
+        self.assertIsNotNone(task_store.fuzzy_pool)
+
+    def test_copy_keeps_ranking_while_the_original_changes(self):
+        random = Random(22)
+        index, descriptions, next_id = FuzzyIndex(), {}, 1
+        copies = []
+        for step in range(300):
+            next_id = self.mutate(random, index, descriptions, next_id)
+            if step % 30 == 0:
+                copies.append((index.copy(), dict(descriptions)))
+        self.assertTrue(self.compact.called)
+        for copy, copied in copies:
+            self.assertRanks(copy, copied)
+        self.assertRanks(index, descriptions)
+
+
+class DateTest(unittest.TestCase):
+    def test_only_plain_iso_dates_are_dates(self):
+        self.assertEqual(date_to_ordinal("2025-02-18"), Date(2025, 2, 18).toordinal())
+        for text in ("20250218", "2025-W07-2", "2025W072", "2025-2-18", "2025-02-30", " 2025-02-18", "٢٠٢٥-٠٢-١٨"):
+            self.assertIsNone(date_to_ordinal(text), text)
+
+    def test_stores_keep_the_same_date_text(self):
+        for store in (TaskList, ColumnarTaskList):
+            with self.subTest(store=store.__name__):
+                task_list = store()
+                task_list.add_task("a", "High", "2025W072")
+                task_list.add_task("b", "Low", "2025-02-11")
+                self.assertEqual([task_list.get_node(task_id).date for task_id in (1, 2)],
+                                 ["2025W072", "2025-02-11"])
+
+
+class ParseQueryTest(unittest.TestCase):
+    def test_field_terms_anywhere_and_text_between(self):
+        self.assertEqual(parse_query('weekly priority:HIGH "plan b" due<2025-03-01 ~reprot status:open notes'), [
+            QueryTerm("text", ":", "weekly"),
+            QueryTerm("priority", ":", "High"),
+            QueryTerm("text", ":", "plan b"),
+            QueryTerm("due", "<", Date(2025, 3, 1).toordinal()),
+            QueryTerm("fuzzy", ":", "reprot"),
+            QueryTerm("status", ":", False),
+            QueryTerm("text", ":", "notes"),
+        ])
+        self.assertEqual(parse_query('due=2025-03-01 ~"buy mlk" x:y'), [
+            QueryTerm("due", ":", Date(2025, 3, 1).toordinal()),
+            QueryTerm("fuzzy", ":", "buy mlk"),
+            QueryTerm("text", ":", "x:y"),
+        ])
+        self.assertEqual(parse_query("due:today"), [QueryTerm("due", ":", Date.today().toordinal())])
+        self.assertEqual(parse_query('  ~ "" '), [QueryTerm("text", ":", "~")])
+
+    def test_values_not_understood_raise(self):
+        for text in ("priority:urgent", "status:maybe", "due<20250301", "due:2025-02-30", "priority<high",
+                     'status:"not done"'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_query(text)
+
+    def test_every_label_is_a_query_word(self):
+        for labels in TASK_LABELS.values():
+            for name in PRIORITY_ORDER:
+                self.assertEqual(parse_query(f'priority:"{labels[name]}"'), [QueryTerm("priority", ":", name)])
+            for status in (True, False):
+                self.assertEqual(parse_query(f'status:"{labels[status]}" x'),
+                                 [QueryTerm("status", ":", status), QueryTerm("text", ":", "x")])
+
+
+class CompileQueryTest(unittest.TestCase):
+    def compile(self, text, base=TaskQuery("", None, None, None, None)):
+        return compile_query(parse_query(text), base)
+
+    def test_conflicting_terms_match_nothing(self):
+        for text in ("priority:high priority:low", "status:done status:open", "due<2025-03-01 due>2025-03-05"):
+            with self.subTest(text=text):
+                query = self.compile(text)
+                self.assertGreaterEqual(query.due[0], query.due[1])
+        query = self.compile("priority:low", TaskQuery("", "High", None, None, None))
+        self.assertGreaterEqual(query.due[0], query.due[1])
+        self.assertEqual(self.compile("priority:high priority:high").due, None)
+
+    def test_due_ranges_are_intersected(self):
+        first, end = Date(2025, 3, 1).toordinal(), Date(2025, 3, 31).toordinal()
+        self.assertEqual(self.compile("due>=2025-03-01 due<2025-03-31").due, (first, end))
+        self.assertEqual(self.compile("due<=2025-03-30", TaskQuery("", None, None, (first + 5, end + 10), None)).due,
+                         (first + 5, end))
+        self.assertEqual(self.compile("due:2025-03-01 due>2025-02-01").due, (first, first + 1))
+
+    def test_contained_texts_are_dropped(self):
+        query = self.compile('rep "weekly report" "REPORT" call', TaskQuery("port", None, None, None, "date"))
+        self.assertEqual((query.search, query.terms), ("weekly report", ("call",)))
+        self.assertEqual(query.sort, "date")
+        query = self.compile("~reprot ~calll status:done", TaskQuery("", None, None, None, "date"))
+        self.assertEqual((query.search, query.status, query.sort), ("", True, FuzzyRank("reprot calll")))
+
+
+class QueryPageTest(unittest.TestCase):
+    # Every store must page through the same ids in the same order as a
+    # brute-force filter and sort of all tasks
+    words = ["report", "weekly report", "call", "تقرير", "Email", "rep", "buy milk"]
+    texts = ["", "priority:high", 'status:open "1"', "due<2025-03-02 rep", "due>=2025-03-01 due<=2025-03-05",
+             '"call" "1"', "priority:low priority:high", "status:done تقر", "report priority:medium status:open",
+             "~reprot", '~"buy mlk" status:open']
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.stores = [TaskList(), TaskList(use_trigram_index=True), ColumnarTaskList(),
+                       ColumnarTaskList(use_trigram_index=True),
+                       SQLiteTaskList(os.path.join(self.directory.name, "tasks.db"))]
+
+    def tearDown(self):
+        for task_list in self.stores:
+            task_list.close()
+        self.directory.cleanup()
+
+    def fill(self, random, count):
+        day = Date(2025, 3, 1).toordinal()
+        for number in range(count):
+            date = Date.fromordinal(day + random.randint(-6, 6)).isoformat() if random.random() < 0.9 else "someday"
+            task = (f"{random.choice(self.words)} {random.randint(0, 20)}", random.choice(list(PRIORITY_ORDER)), date)
+            for task_list in self.stores:
+                task_list.add_task(*task)
+        for task_ids in (random.sample(range(1, count + 1), count // 3), random.sample(range(1, count + 1), 10)):
+            for task_list in self.stores:
+                task_list.toggle_many(task_ids)
+        for task_list in self.stores:
+            task_list.delete_many(range(1, count, 7))
+
+    def brute_force(self, query):
+        nodes = [node for node in self.stores[0].iter_nodes() if task_matches(query, node)]
+        return [node.id for node in sorted(nodes, key=lambda node: sort_key(query.sort, node))]
+
+    def test_pages_match_brute_force(self):
+        random = Random(14)
+        self.fill(random, 300)
+        day = Date(2025, 3, 1).toordinal()
+        for base in (TaskQuery("", None, None, None, None), TaskQuery("rep", "High", None, None, None),
+                     TaskQuery("", None, False, (day - 2, day + 2), None)):
+            for text in self.texts:
+                for sort in SORT_ORDERS:
+                    query = compile_query(parse_query(text), base._replace(sort=sort))
+                    expected = self.brute_force(query)
+                    for task_list in self.stores:
+                        with self.subTest(store=type(task_list).__name__, query=query):
+                            self.assertEqual(task_list.query_page(query), expected)
+                            self.assertEqual(task_list.query_page(query, limit=5), expected[:5])
+                            paged, after = [], None
+                            while True:
+                                page = task_list.query_page(query, after, 4)
+                                paged += page
+                                if len(page) < 4:
+                                    break
+                                after = sort_key(query.sort, task_list.get_node(page[-1]))
+                            self.assertEqual(paged, expected)
+
+    def test_plan_takes_the_narrowest_index(self):
+        task_list = TaskList(use_trigram_index=True)
+        for number in range(200):
+            task_list.add_task(f"task {number}", "High" if number < 5 else "Low",
+                               "2025-03-01" if number % 50 == 0 else "2025-04-01")
+        task_list.toggle_many(range(1, 200, 2))
+        cases = [
+            (TaskQuery("", "High", None, None, "priority"), "priority", True),
+            (TaskQuery("", "High", None, None, "date"), "priority", False),
+            (TaskQuery("", None, None, (1, Date(2025, 3, 2).toordinal()), "date"), "date", True),
+            (TaskQuery("task 17", None, None, None, "date"), "text", False),
+            (TaskQuery("", None, True, None, None), "status", True),
+            (TaskQuery("", None, True, None, "date"), "order", True),  # Half the list: not worth sorting
+            (TaskQuery("", "Low", None, None, "date"), "order", True),
+        ]
+        for query, access, in_order in cases:
+            with self.subTest(query=query):
+                plan = task_list.plan(query)
+                self.assertEqual((plan.access, plan.in_order), (access, in_order))
+                expected = self.brute_force_in(task_list, query)
+                candidates = list(task_list.candidate_ids(plan, query))
+                self.assertLessEqual(set(expected), set(candidates))
+                if plan.in_order:
+                    # An index already in display order is seeked instead of filtered
+                    after = sort_key(query.sort, task_list.get_node(expected[1]))
+                    candidates = [task_id for task_id in task_list.candidate_ids(plan, query, after)
+                                  if task_matches(query, task_list.get_node(task_id))]
+                    self.assertEqual(candidates, expected[2:])
+                self.assertEqual(task_list.query_page(query), expected)
+
+    @staticmethod
+    def brute_force_in(task_list, query):
+        nodes = [node for node in task_list.iter_nodes() if task_matches(query, node)]
+        return [node.id for node in sorted(nodes, key=lambda node: sort_key(query.sort, node))]
+
+
+class ReminderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.stores = [TaskList(), ColumnarTaskList(), SQLiteTaskList(os.path.join(self.directory.name, "tasks.db"))]
+
+    def tearDown(self):
+        for task_list in self.stores:
+            task_list.close()
+        self.directory.cleanup()
+
+    def test_stores_remind_of_the_same_tasks(self):
+        random = Random(22)
+        first = Date(2025, 3, 1).toordinal()
+        reminded_through = 0
+
+        def random_task():
+            date = Date.fromordinal(first + random.randint(0, 20)).isoformat() if random.random() < 0.9 else "someday"
+            return f"task {random.randint(0, 99)}", random.choice(list(PRIORITY_ORDER)), date
+
+        task_ids = []
+        for step in range(600):
+            operation = random.random()
+            if operation < 0.3 or not task_ids:
+                task = random_task()
+                added = {task_list.add_task(*task) for task_list in self.stores}
+                self.assertEqual(len(added), 1)
+                task_ids += added
+            elif operation < 0.4:
+                chosen = random.sample(task_ids, min(2, len(task_ids)))
+                for task_list in self.stores:
+                    task_list.delete_many(chosen)
+                task_ids = [task_id for task_id in task_ids if task_id not in chosen]
+            elif operation < 0.55:
+                chosen = random.sample(task_ids, min(3, len(task_ids)))
+                for task_list in self.stores:
+                    task_list.toggle_many(chosen)
+            elif operation < 0.65:
+                chosen, value = random.sample(task_ids, min(3, len(task_ids))), random.random() < 0.5
+                for task_list in self.stores:
+                    task_list.set_completed_many(chosen, value)
+            elif operation < 0.85:
+                # Often moved to a day already reminded of, or back to its own date
+                task_id = random.choice(task_ids)
+                description, priority, date = random_task()
+                if random.random() < 0.3:
+                    date = self.stores[0].get_node(task_id).date
+                for task_list in self.stores:
+                    task_list.edit_task(task_id, description, priority, date)
+            else:
+                day = first + random.randint(-2, 22)
+                expected = sorted((node.due, node.id) for node in self.stores[0].iter_nodes()
+                                  if not node.completed and reminded_through < node.due <= day)
+                for task_list in self.stores:
+                    self.assertEqual(task_list.pop_due(day), [task_id for _, task_id in expected],
+                                     (step, type(task_list).__name__))
+                reminded_through = max(reminded_through, day)
+            expected = min((node.due for node in self.stores[0].iter_nodes()
+                            if not node.completed and node.due > reminded_through), default=None)
+            for task_list in self.stores:
+                self.assertEqual(task_list.next_due(), expected, (step, type(task_list).__name__))
+
+
+class ColumnarTaskListTest(unittest.TestCase):
+    def test_rejected_edit_changes_nothing(self):
+        task_list = ColumnarTaskList()
+        task_list.add_task("a", "High", "2025-03-01")
+        with self.assertRaises(ValueError):
+            task_list.edit_task(1, "b", "Urgent", "2025-03-02")
+        self.assertEqual(task_list.counts.total, len(task_list))
+        self.assertEqual(task_list.counts.priority("High"), 1)
+        self.assertEqual(task_list.get_task(1), ("a", "High", "2025-03-01", False, 1))
+        self.assertEqual(task_list.next_due(), task_list.get_node(1).due)
+
+
+class TaskSnapshotTest(unittest.TestCase):
+    def test_snapshot_keeps_the_tasks_it_was_taken_with(self):
+        random = Random(13)
+        for use_trigram_index in (False, True):
+            task_list = TaskList(use_trigram_index=use_trigram_index)
+            for number in range(300):
+                task_list.add_task(f"report {number % 37}", random.choice(["High", "Medium", "Low"]),
+                                   f"2025-03-{random.randint(1, 28):02d}")
+            before = [node.copy() for node in task_list.iter_nodes()]
+            snapshot = task_list.snapshot()
+            for _ in range(200):
+                task_ids = list(task_list.nodes)
+                action = random.randrange(4)
+                if action == 0:
+                    task_list.add_task(f"report {random.randrange(50)}", "Low", "2025-04-01")
+                elif action == 1:
+                    task_list.delete_task(random.choice(task_ids))
+                elif action == 2:
+                    task_list.toggle_task_status(random.choice(task_ids))
+                else:
+                    task_list.edit_task(random.choice(task_ids), f"call {random.randrange(50)}", "High", "")
+            self.assertEqual([node.id for node in snapshot.iter_nodes()], [node.id for node in before])
+            for search in ("", "report 1", "call"):
+                for sort in SORT_ORDERS:
+                    query = TaskQuery(search, None, None, None, sort)
+                    expected = [node.id for node in sorted((node for node in before if task_matches(query, node)),
+                                                           key=lambda node: sort_key(sort, node))]
+                    self.assertEqual(snapshot.query_page(query), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
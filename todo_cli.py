@@ -0,0 +1,145 @@
+"""Command-line access to the task list, without Qt.
+
+Imports, exports, lists and counts tasks on machines without PyQt5 or a
+display. Files stream through in bounded memory:
+
+    python todo_cli.py import backlog.csv archive.jsonl
+    python todo_cli.py export open.csv --query "status:open priority:high"
+    python todo_cli.py list --query 'due<2025-03-01 "report"' --sort date --limit 20
+    python todo_cli.py count --query status:done
+    python todo_cli.py list --query "~reprot" --limit 10
+    python todo_cli.py --tasks tasks.db explain --query priority:low
+
+--tasks names a SQLite file (.db, .sqlite) or the JSON Lines file the app
+autosaves to, which is the default.
+"""
+import argparse
+import json
+import os
+import sys
+
+import task_store
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def open_tasks(path):
+    # Returns (task_list, autosaver or None)
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return task_store.SQLiteTaskList(path), None
+    # No fuzzy index: one command runs one query, and scoring each task once
+    # costs less than indexing it
+    task_list = task_store.TaskList()
+    return task_list, task_store.Autosaver(task_list, path)
+
+def build_query(args):
+    base = task_store.TaskQuery("", None, None, None, args.sort)
+    return task_store.compile_query(task_store.parse_query(args.query), base)
+
+def read_file(path):
+    # Task tuples from a CSV or JSON Lines file; errors name the file
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            yield from task_store.read_tasks(file, task_store.task_format(path))
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from None
+
+def run_import(task_list, args):
+    # Every file is read through once before anything is added, so a bad
+    # row anywhere stops the import with the task list unchanged
+    for path in args.files:
+        for _ in read_file(path):
+            pass
+    total, before = 0, len(task_list)
+    try:
+        for path in args.files:
+            count = len(task_list.add_many(read_file(path)))
+            print(f"{path}: imported {count} tasks", file=sys.stderr)
+            total += count
+    except (OSError, ValueError):
+        # Files changed or a write failed after validation; what was added stays
+        print(f"kept {len(task_list) - before} tasks added before the error", file=sys.stderr)
+        raise
+    return total
+
+def run_export(task_list, args):
+    nodes = task_store.query_nodes(task_list, build_query(args))
+    if args.file == "-":
+        count = task_store.write_tasks(sys.stdout, nodes, args.format or "jsonl")
+    else:
+        with open(args.file, "w", encoding="utf-8", newline="") as file:
+            count = task_store.write_tasks(file, nodes, args.format or task_store.task_format(args.file))
+    print(f"exported {count} tasks", file=sys.stderr)
+
+def run_list(task_list, args):
+    for node in task_store.query_nodes(task_list, build_query(args), args.limit):
+        status = "done" if node.completed else "open"
+        print(f"{node.id}\t{node.priority}\t{node.date}\t{status}\t{node.description}")
+
+def run_count(task_list, args):
+    if args.query:
+        print(len(task_list.query_page(build_query(args))))
+    else:
+        print(json.dumps(task_list.counts.as_dict(), indent=2))
+
+def run_explain(task_list, args):
+    print(task_list.explain(build_query(args)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import, export and query tasks without the GUI.")
+    parser.add_argument("--tasks", default=task_store.DEFAULT_TASK_FILE,
+                        help="SQLite file (.db, .sqlite) or JSON Lines task file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="Add tasks from CSV or JSON Lines files")
+    command.add_argument("files", nargs="+")
+    command.set_defaults(run=run_import)
+
+    def add_query_options(command):
+        command.add_argument("--query", default="", help='Search box syntax, e.g. priority:high "report"')
+        command.add_argument("--sort", choices=[sort for sort in task_store.SORT_ORDERS if sort], default=None)
+
+    command = commands.add_parser("export", help="Write matching tasks to a CSV or JSON Lines file")
+    command.add_argument("file", help="Output file, or - for standard output")
+    command.add_argument("--format", choices=["csv", "jsonl"], help="Default: from the file name (jsonl for -)")
+    add_query_options(command)
+    command.set_defaults(run=run_export)
+
+    command = commands.add_parser("list", help="Print matching tasks, one per line")
+    command.add_argument("--limit", type=int)
+    add_query_options(command)
+    command.set_defaults(run=run_list)
+
+    command = commands.add_parser("count", help="Print task counts, or the number of matches with --query")
+    add_query_options(command)
+    command.set_defaults(run=run_count)
+
+    command = commands.add_parser("explain", help="Show how a query would be answered")
+    add_query_options(command)
+    command.set_defaults(run=run_explain)
+
+    args = parser.parse_args(argv)
+    try:
+        task_list, autosaver = open_tasks(args.tasks)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"{args.tasks}: {error}\n")
+    if autosaver is not None and autosaver.read_error is not None:
+        parser.exit(1, f"{args.tasks}: {autosaver.read_error}\n")
+    if autosaver is not None and autosaver.damaged:
+        print(f"{args.tasks}: skipped {autosaver.damaged} damaged lines; the old file was kept as {autosaver.backup}",
+              file=sys.stderr)
+    try:
+        args.run(task_list, args)
+    except BrokenPipeError:
+        # Output piped into head or similar; stop quietly
+        sys.stdout = open(os.devnull, "w")
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"error: {error}\n")
+    finally:
+        if autosaver is not None:
+            autosaver.close()
+        task_list.close()
+    if autosaver is not None and autosaver.error is not None:
+        parser.exit(1, f"error: could not save {args.tasks}: {autosaver.error}\n")
+
+if __name__ == "__main__":
+    main()